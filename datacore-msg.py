@@ -17,23 +17,39 @@ Requirements:
 
 import sys
 import os
+import html
 import json
+import math
+import queue
+import re
+import socket
 import threading
 import asyncio
 import time
+from collections import Counter, OrderedDict
+from fnmatch import fnmatchcase
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from operator import attrgetter
+from typing import Awaitable, Callable, Optional
 
 # PyQt6 for GUI
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTextEdit, QLineEdit, QLabel, QFrame, QScrollArea, QPushButton,
-    QSizePolicy
+    QTextEdit, QLineEdit, QLabel, QFrame, QScrollArea,
+    QSizePolicy, QStackedWidget, QListView, QStyledItemDelegate, QStyle, QToolTip
+)
+from PyQt6.QtCore import (
+    Qt, QTimer, pyqtSignal, QObject, QFileSystemWatcher,
+    QAbstractListModel, QModelIndex, QEvent, QRect, QRectF, QPointF, QSize, QRunnable, QThreadPool
+)
+from PyQt6.QtGui import (
+    QColor, QTextCursor, QTextCharFormat, QFont, QFontMetrics, QPainter, QStaticText,
+    QPixmap, QPixmapCache
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject
-from PyQt6.QtGui import QColor, QTextCursor, QTextCharFormat
 
 # Optional imports
 try:
@@ -48,8 +64,38 @@ try:
 except ImportError:
     HAS_AIOHTTP = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgspec  # Faster msgpack codec; same wire format as msgpack
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
+
+try:
+    import msgpack  # Binary relay frames for clients that negotiate them
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = HAS_MSGSPEC
+
+try:
+    import uvloop as fastloop  # libuv-backed event loop for the relay thread
+    HAS_FASTLOOP = True
+except ImportError:
+    try:
+        import winloop as fastloop  # uvloop port for Windows
+        HAS_FASTLOOP = True
+    except ImportError:
+        HAS_FASTLOOP = False
+
 try:
     import yaml
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     HAS_YAML = True
 except ImportError:
     HAS_YAML = False
@@ -58,59 +104,252 @@ except ImportError:
 
 DATACORE_ROOT = Path(os.environ.get("DATACORE_ROOT", Path.home() / "Data"))
 MODULE_DIR = Path(__file__).parent
-POLL_INTERVAL = 2000  # ms
+POLL_INTERVAL = 2000  # ms, only used when inboxes live on a network mount
+INBOX_LOAD_WINDOW = 64 * 1024  # bytes read per inbox at startup (newest messages)
+MESSAGE_MARKER = b"\n* MESSAGE "
+INBOX_PATHS_TTL = 60  # s before the cached list of inbox files is rescanned
+SEEN_IDS_MAX = 50_000  # message ids remembered for de-duplication
+INBOX_WRITE_DELAY = 0.05  # s the writer thread gathers entries before appending
+NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "9p"}
 RELAY_PORT = 8080
+DEFAULT_RELAY_URL = "wss://datacore-messaging-relay.datafund.ai/ws"
+RELAY_BATCH_DELAY = 0.05  # s the client gathers relay messages before handing them to the GUI
+RELAY_PRESENCE_DELAY = 0.25  # s the relay gathers joins/status changes into one presence broadcast
+RELAY_OFFLINE_DELAY = 0.05  # s for leaves, which shouldn't wait behind a long window
+RELAY_MAX_MSG_SIZE = 64 * 1024  # bytes per inbound frame
+RELAY_SEND_TIMEOUT = 5  # s before a stalled peer is dropped
+RELAY_HEARTBEAT = 60  # s between server pings; a peer silent past it (plus a pong wait) is dropped
+RELAY_KEEPALIVE = (60, 20, 3)  # TCP keepalive: idle s, probe interval s, probes before drop
+RELAY_SEND_QUEUE = 256  # frames buffered per user before it is dropped
+RELAY_MAX_USERS = 2048
+RELAY_BACKLOG = 4096  # listen queue; absorbs reconnect storms after a network blip
+RELAY_MAX_CONNS_PER_IP = 16  # loopback (e.g. a local reverse proxy) is exempt
+LOOPBACK_ADDRS = {"127.0.0.1", "::1"}
+CLAUDE_SUFFIX = "-claude"  # "<owner>-claude" is owner's personal Claude agent
+CLAUDE_SUFFIX_LEN = len(CLAUDE_SUFFIX)
+
+# Status tag on a MESSAGE header line
+STATUS_TAG_RE = re.compile(r" :(?:unread|todo|done):")
+
+# A run of blank (or whitespace-only) lines inside a message body
+BLANK_LINES_RE = re.compile(r"\n\s*\n")
+
+# `:KEY: value` lines of a properties drawer
+ORG_PROPERTY_RE = re.compile(r"^[ \t]*:([A-Za-z_]+):[ \t]*(.*?)[ \t]*$", re.M)
+
+# Input line syntax: @user [>reply-id ][[route]]text
+SEND_RE = re.compile(r"@(\S+) (?:>(\S*) )?(?:\[([^\]]*)\])?(.*)", re.S)
+
+# JSON codec for relay frames: orjson when installed, stdlib otherwise.
+# Frames stay text (str) so existing clients keep working.
+if HAS_ORJSON:
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+    json_loads = orjson.loads
+else:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+# WebSocket subprotocol for msgpack frames; without it both sides speak JSON text
+RELAY_MSGPACK_PROTOCOL = "msgpack"
+
+
+# msgpack codec for binary frames: msgspec's reusable encoder/decoder when
+# installed, the msgpack package otherwise
+if HAS_MSGSPEC:
+    msgpack_dumps = msgspec.msgpack.Encoder().encode
+    _msgspec_decode = msgspec.msgpack.Decoder().decode
+
+    def msgpack_loads(frame: bytes):
+        try:
+            return _msgspec_decode(frame)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+elif HAS_MSGPACK:
+    msgpack_dumps = msgpack.packb
+    msgpack_loads = msgpack.unpackb
 
 
-def get_settings() -> dict:
-    """Load settings from yaml."""
-    if not HAS_YAML:
-        return {}
+def relay_encode(payload: dict, binary: bool) -> str | bytes:
+    """A relay frame: msgpack bytes on a negotiated msgpack socket, JSON text otherwise."""
+    return msgpack_dumps(payload) if binary else json_dumps(payload)
 
-    settings = {}
+
+def relay_decode(frame: str | bytes):
+    """Decode a relay frame of either kind; raises ValueError if malformed."""
+    return msgpack_loads(frame) if isinstance(frame, bytes) else json_loads(frame)
+
+
+# Pings as clients encode them, matched verbatim so heartbeats skip decoding,
+# and the pong for each wire format (keyed by "binary")
+PING_FRAMES = {'{"type":"ping"}', '{"type": "ping"}'}
+PONG_FRAMES = {False: relay_encode({"type": "pong"}, False)}
+if HAS_MSGPACK:
+    PING_FRAMES.add(relay_encode({"type": "ping"}, True))
+    PONG_FRAMES[True] = relay_encode({"type": "pong"}, True)
+
+
+# Parsed settings, reused until settings.local.yaml changes on disk
+_SETTINGS_CACHE: Optional[tuple] = None  # ((mtime_ns, size), settings)
+_CONFIG_CACHE: Optional[tuple] = None  # (settings, Settings built from them)
+_NO_SETTINGS = MappingProxyType({})
+
+
+def get_settings() -> MappingProxyType:
+    """Load settings from yaml (cached until the file changes).
+
+    The result is shared between callers, so it is returned read-only.
+    """
+    global _SETTINGS_CACHE
+
+    if not HAS_YAML:
+        return _NO_SETTINGS
 
     # Module settings
     module_settings = MODULE_DIR / "settings.local.yaml"
-    if module_settings.exists():
-        try:
-            settings = yaml.safe_load(module_settings.read_text()) or {}
-        except:
-            pass
+    key = stat_key(module_settings)
+    if key is None:
+        _SETTINGS_CACHE = None
+        return _NO_SETTINGS
 
-    return settings
+    if _SETTINGS_CACHE and _SETTINGS_CACHE[0] == key:
+        return _SETTINGS_CACHE[1]
+
+    settings = {}
+    try:
+        settings = yaml.load(module_settings.read_bytes(), Loader=YAML_LOADER)  # libyaml decodes bytes itself or {}
+    except (OSError, ValueError, yaml.YAMLError):
+        pass
+    if not isinstance(settings, dict):
+        settings = {}
+
+    _SETTINGS_CACHE = (key, MappingProxyType(settings))
+    return _SETTINGS_CACHE[1]
+
+
+def reset_settings_cache():
+    """Drop cached settings so the next access re-reads the file."""
+    global _SETTINGS_CACHE, _CONFIG_CACHE
+    _SETTINGS_CACHE = _CONFIG_CACHE = None
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """The settings this app reads, pulled out of the nested yaml once."""
+    username: Optional[str] = None
+    default_space: Optional[str] = None
+    relay_url: str = DEFAULT_RELAY_URL
+    relay_secret: str = ""
+    claude_whitelist: tuple[str, ...] = ()
+
+    @classmethod
+    def from_mapping(cls, conf) -> "Settings":
+        identity = conf.get("identity") or {}
+        messaging = conf.get("messaging") or {}
+        relay = messaging.get("relay") or {}
+        return cls(
+            username=identity.get("name"),
+            default_space=messaging.get("default_space"),
+            relay_url=relay.get("url", DEFAULT_RELAY_URL),
+            relay_secret=relay.get("secret", ""),
+            claude_whitelist=tuple(messaging.get("claude_whitelist") or ()),
+        )
+
+
+def get_config() -> Settings:
+    """Typed settings, rebuilt only when get_settings() re-read the file."""
+    global _CONFIG_CACHE
+    conf = get_settings()
+    if _CONFIG_CACHE is None or _CONFIG_CACHE[0] is not conf:
+        _CONFIG_CACHE = (conf, Settings.from_mapping(conf))
+    return _CONFIG_CACHE[1]
+
+
+def scan_inboxes() -> list[Path]:
+    """All */org/inboxes/*.org files under DATACORE_ROOT.
+
+    os.scandir gets file types from the directory listing, so unlike
+    Path.glob this doesn't stat every entry it walks past.
+    """
+    inboxes = []
+    try:
+        with os.scandir(DATACORE_ROOT) as spaces:
+            space_dirs = [e.path for e in spaces if e.is_dir()]
+    except OSError:
+        return inboxes
+    for space in space_dirs:
+        try:
+            with os.scandir(os.path.join(space, "org", "inboxes")) as entries:
+                inboxes.extend(Path(e.path) for e in entries
+                               if e.name.endswith(".org") and e.is_file())
+        except OSError:
+            continue
+    return sorted(inboxes)
+
+
+def get_fs_type(path: Path) -> str:
+    """Filesystem type of the mount holding path, from /proc/mounts ("" if unknown)."""
+    real = os.path.realpath(path)
+    best, fs_type = "", ""
+    try:
+        mounts = Path("/proc/mounts").read_text().splitlines()
+    except OSError:
+        return ""
+    for line in mounts:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        mount = parts[1].replace("\\040", " ")
+        inside = real == mount or real.startswith(mount.rstrip("/") + "/")
+        if inside and len(mount) > len(best):
+            best, fs_type = mount, parts[2]
+    return fs_type
 
 
 def get_username() -> str:
     if "DATACORE_USER" in os.environ:
         return os.environ["DATACORE_USER"]
-    conf = get_settings()
-    return conf.get("identity", {}).get("name", os.environ.get("USER", "unknown"))
+    name = get_config().username
+    return name if name is not None else os.environ.get("USER", "unknown")
 
 
 def get_default_space() -> str:
-    conf = get_settings()
-    space = conf.get("messaging", {}).get("default_space")
+    space = get_config().default_space
     if space:
         return space
-    for p in sorted(DATACORE_ROOT.glob("[1-9]-*")):
-        if p.is_dir():
-            return p.name
-    return "1-team"
+    return first_space_dir() or "1-team"
+
+
+_SPACE_CACHE: Optional[tuple] = None  # (root mtime_ns, first space name)
+
+
+def first_space_dir() -> Optional[str]:
+    """Lowest-numbered "N-name" space under DATACORE_ROOT, cached on the root's mtime."""
+    global _SPACE_CACHE
+    try:
+        mtime = DATACORE_ROOT.stat().st_mtime_ns
+        if _SPACE_CACHE and _SPACE_CACHE[0] == mtime:
+            return _SPACE_CACHE[1]
+        with os.scandir(DATACORE_ROOT) as entries:
+            space = min((e.name for e in entries
+                         if e.name[:1] in "123456789" and e.name[1:2] == "-" and e.is_dir()),
+                        default=None)
+    except OSError:
+        return None
+    _SPACE_CACHE = (mtime, space)
+    return space
 
 
 def get_relay_url() -> str:
-    conf = get_settings()
-    return conf.get("messaging", {}).get("relay", {}).get("url", "wss://datacore-messaging-relay.datafund.ai/ws")
+    return get_config().relay_url
 
 
 def get_relay_secret() -> str:
-    conf = get_settings()
-    return conf.get("messaging", {}).get("relay", {}).get("secret", "")
+    return get_config().relay_secret
 
 
-def get_claude_whitelist() -> list:
-    conf = get_settings()
-    return conf.get("messaging", {}).get("claude_whitelist", [])
+def get_claude_whitelist() -> tuple[str, ...]:
+    return get_config().claude_whitelist
 
 
 def is_relay_enabled() -> bool:
@@ -119,191 +358,439 @@ def is_relay_enabled() -> bool:
 
 # === RELAY SERVER (embedded) ===
 
-@dataclass
+@dataclass(slots=True)
 class RelayUser:
     username: str
     ws: web.WebSocketResponse
     connected_at: float = field(default_factory=time.time)
-    claude_whitelist: list = field(default_factory=list)
+    claude_whitelist: Optional[frozenset] = None  # None: anyone may message <username>-claude
     status: str = "online"  # online, busy, away, focusing
+    binary: bool = False  # Negotiated msgpack frames instead of JSON text
+    # Outgoing frames; drained by `writer`, the only task writing to ws
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(RELAY_SEND_QUEUE))
+    writer: Optional[asyncio.Task] = None
+    closer: Optional[asyncio.Task] = None  # Set once the user is dropped for falling behind
+
+
+@dataclass(slots=True)
+class RelayConnection:
+    """Per-socket state passed to the relay's message handlers."""
+    ws: web.WebSocketResponse
+    binary: bool = False  # Negotiated msgpack frames instead of JSON text
+    username: Optional[str] = None  # Set once auth succeeds
+    user: Optional[RelayUser] = None
+
+
+def enable_keepalive(request: web.Request) -> None:
+    """Have the kernel probe the peer's connection, so dead clients drop without heartbeat timers."""
+    sock = request.transport.get_extra_info("socket") if request.transport else None
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):  # Linux; elsewhere the OS defaults apply
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, RELAY_KEEPALIVE[0])
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, RELAY_KEEPALIVE[1])
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, RELAY_KEEPALIVE[2])
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=4096)
+def send_ack_frame(to: str, delivered: bool, auto_replied: bool, binary: bool) -> str | bytes:
+    """Encoded send_ack; acks repeat per target, so each is encoded once."""
+    ack = {"type": "send_ack", "to": to, "delivered": delivered}
+    if auto_replied:
+        ack["auto_replied"] = True
+    return relay_encode(ack, binary)
+
+
+@lru_cache(maxsize=1024)
+def auto_reply_frame(sender: str, text: str, binary: bool) -> str | bytes:
+    """Encoded auto-reply; a sender retrying a blocked target gets the cached frame."""
+    return relay_encode({
+        "type": "message",
+        "from": sender,
+        "text": text,
+        "priority": "normal",
+        "auto_reply": True
+    }, binary)
+
+
+@lru_cache(maxsize=4096)
+def claude_owner(to_user: str) -> Optional[str]:
+    """Owner of a "<owner>-claude" target, or None for a plain username."""
+    if to_user.endswith(CLAUDE_SUFFIX):
+        return to_user[:-CLAUDE_SUFFIX_LEN]
+    return None
 
 
 class EmbeddedRelay:
     """Lightweight relay server that runs in a thread."""
 
-    def __init__(self, secret: str, port: int = 8080):
+    def __init__(self, secret: str, port: int = 8080, max_users: int = RELAY_MAX_USERS,
+                 max_conns_per_ip: int = RELAY_MAX_CONNS_PER_IP):
         self.secret = secret
         self.port = port
+        self.max_users = max_users
+        self.max_conns_per_ip = max_conns_per_ip
         self.users: dict[str, RelayUser] = {}
-        self.app = None
-        self.runner = None
+        self.conns_per_ip: Counter[str] = Counter()
+        self.app: Optional[web.Application] = None
+        self.runner: Optional[web.AppRunner] = None
+        # Online names/statuses, kept in step with self.users by _add_user,
+        # _remove_user and _set_status rather than rebuilt per frame
+        self._online: tuple[str, ...] = ()
+        self._statuses: dict[str, str] = {}
+        # Encoded "presence" snapshot per protocol (keyed by binary), dropped on user change
+        self._presence_frames: dict[bool, str | bytes] = {}
+        # Presence changes waiting for the next coalesced broadcast
+        self._pending_presence: dict[str, str] = {}
+        self._presence_flush: Optional[asyncio.TimerHandle] = None
+        # Frame type -> handler; each handler checks its own auth precondition
+        self._handlers: dict[str, Callable[[RelayConnection, dict], Awaitable[None]]] = {
+            "auth": self._on_auth,
+            "send": self._on_send,
+            "presence": self._on_presence,
+            "status_change": self._on_status_change,
+            "ping": self._on_ping,
+        }
 
-    def resolve_claude_target(self, from_user: str, to_user: str) -> tuple:
+    def _add_user(self, user: RelayUser) -> None:
+        """Register user, replacing any connection under the same name."""
+        username = user.username
+        if username not in self.users:
+            self._online += (username,)
+        self.users[username] = user
+        self._statuses[username] = user.status
+        self._presence_frames.clear()
+
+    def _remove_user(self, username: str) -> None:
+        del self.users[username]
+        del self._statuses[username]
+        self._online = tuple(self.users)
+        self._presence_frames.clear()
+
+    def _set_status(self, username: str, status: str) -> None:
+        self.users[username].status = status
+        self._statuses[username] = status
+        self._presence_frames.clear()
+
+    def resolve_claude_target(self, from_user: str, to_user: str) -> tuple[str, bool, Optional[str]]:
         if to_user == "claude":
             return (f"{from_user}-claude", True, None)
 
-        if to_user.endswith("-claude"):
-            owner = to_user.rsplit("-claude", 1)[0]
+        owner = claude_owner(to_user)
+        if owner is not None:
             owner_user = self.users.get(owner)
-            if owner_user and owner_user.claude_whitelist:
-                if from_user not in owner_user.claude_whitelist:
-                    return (to_user, False,
-                            f"Auto-reply: @{owner}-claude is not accepting messages from @{from_user}.")
+            allowed = owner_user.claude_whitelist if owner_user else None
+            if allowed is not None and from_user not in allowed:
+                return (to_user, False,
+                        f"Auto-reply: @{owner}-claude is not accepting messages from @{from_user}.")
 
         return (to_user, True, None)
 
-    async def route_message(self, from_user: str, to_user: str, message: dict, sender_ws=None):
-        resolved, allowed, auto_reply = self.resolve_claude_target(from_user, to_user)
-
-        if not allowed and auto_reply and sender_ws:
-            await sender_ws.send_json({
-                "type": "message",
-                "from": resolved,
-                "text": auto_reply,
-                "priority": "normal",
-                "auto_reply": True
-            })
+    async def _writer(self, user: RelayUser) -> None:
+        """Drain a user's send queue; a stalled peer gets disconnected."""
+        queue = user.queue
+        ws = user.ws
+        send = ws.send_bytes if user.binary else ws.send_str
+        try:
+            while True:
+                frame = await queue.get()
+                await asyncio.wait_for(send(frame), RELAY_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Closing ends the peer's handler loop, which runs the cleanup
+            await ws.close()
+        except ConnectionError:
+            pass  # Socket already going away
+
+    def _enqueue(self, user: RelayUser, frame: str | bytes) -> bool:
+        """Queue a frame, encoded for user's protocol, dropping the user if it has fallen behind."""
+        if user.closer:
+            return False  # Already being dropped; one close is enough
+        try:
+            user.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            user.closer = asyncio.create_task(user.ws.close())
+            return False
+
+    async def _reply(self, conn: RelayConnection, payload: dict) -> None:
+        """Answer on conn's socket, through its writer once authenticated."""
+        await self._reply_frame(conn, relay_encode(payload, conn.binary))
+
+    async def _reply_frame(self, conn: RelayConnection, frame: str | bytes) -> None:
+        """Like _reply, for a frame already encoded for conn's protocol."""
+        if conn.user:
+            self._enqueue(conn.user, frame)
+        elif conn.binary:
+            await conn.ws.send_bytes(frame)
+        else:
+            await conn.ws.send_str(frame)
+
+    async def route_message(self, from_user: str, to_user: str, message: dict,
+                            sender: Optional[RelayUser] = None,
+                            target: Optional[tuple[str, bool, Optional[str]]] = None) -> bool | str:
+        """Deliver a message; `target` is a resolve_claude_target result if the caller has one.
+
+        `message` becomes the outgoing frame, so pass a dict built for this call.
+        """
+        resolved, allowed, auto_reply = target or self.resolve_claude_target(from_user, to_user)
+
+        if not allowed and auto_reply and sender:
+            self._enqueue(sender, auto_reply_frame(resolved, auto_reply, sender.binary))
             return "auto_replied"
 
         recipient = self.users.get(resolved)
         if recipient:
-            await recipient.ws.send_json({
-                "type": "message",
-                "from": from_user,
-                **message
-            })
-            return True
+            message["type"] = "message"
+            message["from"] = from_user
+            return self._enqueue(recipient, relay_encode(message, recipient.binary))
         return False
 
-    async def broadcast_presence(self, username: str, status: str):
-        """Broadcast presence/status change to all connected users."""
-        # Build online list with statuses
-        online_with_status = {u: self.users[u].status for u in self.users}
-        for user in list(self.users.values()):
-            if user.username != username:
-                try:
-                    await user.ws.send_json({
-                        "type": "presence_change",
-                        "user": username,
-                        "status": status,
-                        "online": list(self.users.keys()),
-                        "statuses": online_with_status
-                    })
-                except:
-                    pass
-
-    async def handle_ws(self, request):
-        ws = web.WebSocketResponse(heartbeat=30)
-        await ws.prepare(request)
-        username = None
-
+    def broadcast_presence(self, username: str, status: str) -> None:
+        """Queue a presence/status change for the next broadcast to all users.
+
+        Changes within RELAY_PRESENCE_DELAY go out as one frame, so a
+        reconnect storm of K users costs one broadcast rather than K.
+        A leave brings the pending broadcast forward to RELAY_OFFLINE_DELAY.
+        """
+        self._pending_presence.pop(username, None)  # Keep changes in arrival order
+        self._pending_presence[username] = status
+        loop = asyncio.get_running_loop()
+        delay = RELAY_OFFLINE_DELAY if status == "offline" else RELAY_PRESENCE_DELAY
+        flush = self._presence_flush
+        if flush is not None:
+            if flush.when() <= loop.time() + delay:
+                return
+            flush.cancel()
+        self._presence_flush = loop.call_later(delay, self._flush_presence)
+
+    def _flush_presence(self) -> None:
+        """Send the pending presence changes, plus the current online list."""
+        self._presence_flush = None
+        changes, self._pending_presence = self._pending_presence, {}
+        if not changes:
+            return
+        # "user"/"status" carry the last change for clients that read only those
+        username, status = next(reversed(changes.items()))
+        payload = {
+            "type": "presence_change",
+            "user": username,
+            "status": status,
+            "changes": changes,
+            "online": self._online,
+            "statuses": self._statuses
+        }
+        # A lone change isn't echoed to the user who made it
+        skip = username if len(changes) == 1 else None
+        # Encode at most once per protocol, not once per peer
+        frames = {}
+        for name, user in self.users.items():
+            if name != skip and not user.ws.closed:
+                frame = frames.get(user.binary)
+                if frame is None:
+                    frame = frames[user.binary] = relay_encode(payload, user.binary)
+                self._enqueue(user, frame)
+
+    def _release_ip(self, remote: str) -> None:
+        """Give back a connection slot taken by handle_ws."""
+        self.conns_per_ip[remote] -= 1
+        if self.conns_per_ip[remote] <= 0:
+            del self.conns_per_ip[remote]
+
+    async def handle_ws(self, request: web.Request) -> web.StreamResponse:
+        remote = request.remote or ""
+        limit_ip = remote not in LOOPBACK_ADDRS
+        if limit_ip:
+            if self.conns_per_ip[remote] >= self.max_conns_per_ip:
+                return web.Response(status=429, text="Too many connections")
+            # Counted before the first await, so concurrent upgrades see each other
+            self.conns_per_ip[remote] += 1
+
+        # Chat frames are small: skip per-message deflate and cap frame size
+        # The heartbeat reaps silent peers (also behind a proxy); kernel
+        # keepalive only supplements it on direct connections
+        ws = web.WebSocketResponse(heartbeat=RELAY_HEARTBEAT, compress=False,
+                                   max_msg_size=RELAY_MAX_MSG_SIZE,
+                                   protocols=(RELAY_MSGPACK_PROTOCOL,) if HAS_MSGPACK else ())
+        try:
+            await ws.prepare(request)
+        except BaseException:
+            if limit_ip:
+                self._release_ip(remote)
+            raise
+        enable_keepalive(request)
+        conn = RelayConnection(ws, binary=ws.ws_protocol == RELAY_MSGPACK_PROTOCOL)
+
+        handlers = self._handlers
         try:
             async for msg in ws:
-                if msg.type == WSMsgType.TEXT:
-                    try:
-                        data = json.loads(msg.data)
-                    except:
-                        continue
-
-                    msg_type = data.get("type")
-
-                    if msg_type == "auth":
-                        if data.get("secret") != self.secret:
-                            await ws.send_json({"type": "auth_error", "message": "Invalid secret"})
-                            continue
-
-                        username = data.get("username", "")
-                        if not username:
-                            await ws.send_json({"type": "auth_error", "message": "Username required"})
-                            continue
-
-                        # Disconnect old connection
-                        if username in self.users:
-                            try:
-                                await self.users[username].ws.close()
-                            except:
-                                pass
-
-                        initial_status = data.get("status", "online")
-                        self.users[username] = RelayUser(
-                            username=username,
-                            ws=ws,
-                            claude_whitelist=data.get("claude_whitelist", []),
-                            status=initial_status
-                        )
+                if msg.type is WSMsgType.ERROR:
+                    break
+                if msg.type is not WSMsgType.TEXT and not (conn.binary and msg.type is WSMsgType.BINARY):
+                    continue  # binary frames only on a negotiated msgpack socket
+                if msg.data in PING_FRAMES:
+                    await self._on_ping(conn, None)
+                    continue
 
-                        # Build online list with statuses
-                        online_with_status = {u: self.users[u].status for u in self.users}
-                        await ws.send_json({
-                            "type": "auth_ok",
-                            "username": username,
-                            "online": list(self.users.keys()),
-                            "statuses": online_with_status
-                        })
-                        await self.broadcast_presence(username, initial_status)
-
-                    elif msg_type == "send" and username:
-                        to_user = data.get("to", "").lstrip("@")
-                        text = data.get("text", "")
-
-                        if not to_user or not text:
-                            continue
-
-                        resolved, _, _ = self.resolve_claude_target(username, to_user)
-                        msg_payload = {
-                            "text": text,
-                            "priority": data.get("priority", "normal"),
-                            "msg_id": data.get("msg_id", ""),
-                            "timestamp": time.time()
-                        }
-                        # Include threading info if present
-                        if data.get("thread"):
-                            msg_payload["thread"] = data["thread"]
-                        if data.get("reply_to"):
-                            msg_payload["reply_to"] = data["reply_to"]
-
-                        result = await self.route_message(
-                            username, to_user, msg_payload, sender_ws=ws
-                        )
+                try:
+                    data = relay_decode(msg.data)
+                except ValueError:
+                    continue
+                if not isinstance(data, dict):
+                    continue
 
-                        if result == "auto_replied":
-                            await ws.send_json({"type": "send_ack", "to": resolved, "delivered": False, "auto_replied": True})
-                        else:
-                            await ws.send_json({"type": "send_ack", "to": resolved, "delivered": bool(result)})
-
-                    elif msg_type == "presence" and username:
-                        online_with_status = {u: self.users[u].status for u in self.users}
-                        await ws.send_json({
-                            "type": "presence",
-                            "online": list(self.users.keys()),
-                            "statuses": online_with_status
-                        })
-
-                    elif msg_type == "status_change" and username:
-                        new_status = data.get("status", "online")
-                        if new_status in ("online", "busy", "away", "focusing"):
-                            self.users[username].status = new_status
-                            await self.broadcast_presence(username, new_status)
-                            await ws.send_json({"type": "status_ok", "status": new_status})
-
-                    elif msg_type == "ping":
-                        await ws.send_json({"type": "pong"})
+                handler = handlers.get(data.get("type"))
+                if handler:
+                    await handler(conn, data)
 
         finally:
-            if username:
-                self.users.pop(username, None)
-                await self.broadcast_presence(username, "offline")
+            if limit_ip:
+                self._release_ip(remote)
+            if conn.user and conn.user.writer:
+                conn.user.writer.cancel()
+            username = conn.username
+            # Skip cleanup if a newer connection has taken over this username
+            user = self.users.get(username) if username else None
+            if user and user.ws is ws:
+                self._remove_user(username)
+                self.broadcast_presence(username, "offline")
 
         return ws
 
-    async def handle_status(self, request):
+    async def _on_auth(self, conn: RelayConnection, data: dict) -> None:
+        ws = conn.ws
+        if data.get("secret") != self.secret:
+            await self._reply(conn, {"type": "auth_error", "message": "Invalid secret"})
+            return
+
+        username = data.get("username", "")
+        if not username or not isinstance(username, str):
+            await self._reply(conn, {"type": "auth_error", "message": "Username required"})
+            return
+        # Interned once here; every later lookup and compare can hit the identity fast path
+        username = sys.intern(username)
+
+        if username not in self.users and len(self.users) >= self.max_users:
+            await self._reply(conn, {"type": "auth_error", "message": "Server full"})
+            await ws.close()
+            return
+
+        # Disconnect old connection
+        old = self.users.get(username)
+        if old and old.ws is not ws:
+            try:
+                await old.ws.close()
+            except ConnectionError:
+                pass
+
+        if conn.user and conn.user.writer:
+            conn.user.writer.cancel()  # Re-auth on the same socket
+        # Re-auth under another name releases the old one, unless a newer
+        # connection has already taken it over
+        previous = conn.username
+        if previous and previous != username and self.users.get(previous) is conn.user:
+            self._remove_user(previous)
+            self.broadcast_presence(previous, "offline")
+
+        initial_status = data.get("status", "online")
+        user = RelayUser(
+            username=username,
+            ws=ws,
+            claude_whitelist=frozenset(data.get("claude_whitelist") or ()) or None,
+            status=initial_status,
+            binary=conn.binary,
+        )
+        user.writer = asyncio.create_task(self._writer(user))
+        conn.username, conn.user = username, user
+        self._add_user(user)
+
+        await self._reply(conn, {
+            "type": "auth_ok",
+            "username": username,
+            "online": self._online,
+            "statuses": self._statuses
+        })
+        self.broadcast_presence(username, initial_status)
+
+    async def _on_send(self, conn: RelayConnection, data: dict) -> None:
+        username = conn.username
+        if not username:
+            return
+
+        to_user = data.get("to", "")
+        text = data.get("text", "")
+        priority = data.get("priority", "normal")
+        msg_id = data.get("msg_id", "")
+        if isinstance(to_user, str):
+            to_user = to_user.lstrip("@")
+        # Frames can carry numbers, or bytes over msgpack, where strings belong
+        if not (to_user and text and isinstance(to_user, str) and isinstance(text, str)
+                and isinstance(priority, str) and isinstance(msg_id, str)):
+            await self._reply(conn, {"type": "error", "message": "Missing 'to' or 'text'"})
+            return
+
+        target = self.resolve_claude_target(username, to_user)
+        resolved = target[0]
+        msg_payload = {
+            "text": text,
+            "priority": priority,
+            "msg_id": msg_id,
+            "timestamp": time.time_ns(),  # int ns since epoch
+        }
+        # Include threading info if present
+        thread = data.get("thread")
+        if thread and isinstance(thread, str):
+            msg_payload["thread"] = thread
+        reply_to = data.get("reply_to")
+        if reply_to and isinstance(reply_to, str):
+            msg_payload["reply_to"] = reply_to
+
+        result = await self.route_message(
+            username, to_user, msg_payload, sender=conn.user, target=target
+        )
+
+        if result == "auto_replied":
+            await self._reply_frame(conn, send_ack_frame(resolved, False, True, conn.binary))
+        else:
+            await self._reply_frame(conn, send_ack_frame(resolved, bool(result), False, conn.binary))
+
+    async def _on_presence(self, conn: RelayConnection, data: dict) -> None:
+        if not conn.username:
+            return
+        # Every requester gets the same snapshot, so encode it once per change
+        frame = self._presence_frames.get(conn.binary)
+        if frame is None:
+            frame = self._presence_frames[conn.binary] = relay_encode({
+                "type": "presence",
+                "online": self._online,
+                "statuses": self._statuses
+            }, conn.binary)
+        await self._reply_frame(conn, frame)
+
+    async def _on_status_change(self, conn: RelayConnection, data: dict) -> None:
+        username = conn.username
+        if not username:
+            return
+        new_status = data.get("status", "online")
+        if new_status in ("online", "busy", "away", "focusing"):
+            self._set_status(username, new_status)
+            self.broadcast_presence(username, new_status)
+            await self._reply(conn, {"type": "status_ok", "status": new_status})
+
+    async def _on_ping(self, conn: RelayConnection, data: Optional[dict]) -> None:
+        await self._reply_frame(conn, PONG_FRAMES[conn.binary])
+
+    async def handle_status(self, request: web.Request) -> web.Response:
         return web.json_response({
             "status": "ok",
-            "users_online": len(self.users),
-            "users": list(self.users.keys())
-        })
+            "users_online": len(self._online),
+            "users": self._online
+        }, dumps=json_dumps)
 
-    async def start(self):
+    async def start(self) -> None:
         self.app = web.Application()
         self.app.router.add_get("/", self.handle_status)
         self.app.router.add_get("/status", self.handle_status)
@@ -311,155 +798,557 @@ class EmbeddedRelay:
 
         self.runner = web.AppRunner(self.app)
         await self.runner.setup()
-        site = web.TCPSite(self.runner, "0.0.0.0", self.port)
+        # No reuse_port: relays don't share user tables, so a second --host
+        # on the same port must fail rather than silently split the team
+        site = web.TCPSite(self.runner, "0.0.0.0", self.port, backlog=RELAY_BACKLOG)
         await site.start()
         print(f"Relay server running on port {self.port}")
 
-    async def stop(self):
+    async def stop(self) -> None:
+        if self._presence_flush:
+            self._presence_flush.cancel()
+            self._presence_flush = None
         if self.runner:
             await self.runner.cleanup()
 
 
+# === INBOX WRITES ===
+
+def stat_key(path: Path) -> Optional[tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class InboxWriter(threading.Thread):
+    """Appends inbox entries off the GUI thread.
+
+    Entries queued within INBOX_WRITE_DELAY of each other are written with
+    one open/write per inbox. `on_written(inbox, before, after, entries)`
+    is called from this thread after each append, with stat_key()s taken
+    around it.
+    """
+
+    def __init__(self, on_written: Callable[[Path, Optional[tuple], Optional[tuple], list], None]):
+        super().__init__(name="inbox-writer", daemon=True)
+        self.queue: queue.Queue = queue.Queue()
+        self.on_written = on_written
+
+    def write(self, inbox: Path, entry: str):
+        self.queue.put((inbox, entry))
+
+    def stop(self):
+        """Write anything still queued, then end the thread."""
+        self.queue.put(None)
+        self.join(timeout=5)
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + INBOX_WRITE_DELAY
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._append(batch)
+
+    def _append(self, batch: list):
+        by_inbox: dict[Path, list[str]] = {}
+        for inbox, entry in batch:
+            by_inbox.setdefault(inbox, []).append(entry)
+        for inbox, entries in by_inbox.items():
+            try:
+                inbox.parent.mkdir(parents=True, exist_ok=True)
+                before = stat_key(inbox)
+                with open(inbox, "a") as f:
+                    f.write("".join(entries))
+            except OSError as e:
+                print(f"Inbox writer: can't write {inbox}: {e}")
+                continue
+            self.on_written(inbox, before, stat_key(inbox), entries)
+
+
 # === GUI ===
 
-class MessageRow(QFrame):
-    """A message row with status button and delete button."""
-    status_clicked = pyqtSignal(str, str)  # msg_id, current_status
-    delete_clicked = pyqtSignal(str)  # msg_id
+class BoundedSet:
+    """Set of the most recently added strings; the least recently added drop out past maxlen."""
+    __slots__ = ("maxlen", "_items")
 
-    def __init__(self, msg_data: dict, parent=None):
-        super().__init__(parent)
-        self.msg_data = msg_data
-        self.msg_id = msg_data.get("id", "")
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._items: OrderedDict[str, None] = OrderedDict()
 
-        self.setStyleSheet("""
-            MessageRow { background-color: #252526; border-radius: 4px; margin: 2px 0; }
-            MessageRow:hover { background-color: #2d2d2d; }
-        """)
+    def __contains__(self, item: str) -> bool:
+        return item in self._items
 
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(8, 6, 8, 6)
-        layout.setSpacing(8)
+    def __len__(self) -> int:
+        return len(self._items)
 
-        # Status button (left side)
-        self.status_btn = QPushButton()
-        self.status_btn.setFixedSize(24, 24)
-        self.status_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.status_btn.clicked.connect(self._on_status_click)
-        self._update_status_button()
-        layout.addWidget(self.status_btn)
+    def add(self, item: str):
+        if item in self._items:
+            self._items.move_to_end(item)  # Still live: keep it away from the eviction end
+            return
+        # Ids share long prefixes and recur across inboxes and views
+        self._items[sys.intern(item)] = None
+        if len(self._items) > self.maxlen:
+            self._items.popitem(last=False)
+
+
+@dataclass(slots=True)
+class ParsedMsg:
+    """One MESSAGE block from an org inbox."""
+    id: str
+    sender: str
+    text: str
+    time: str
+    unread: bool = False
+    todo: bool = False
+    done: bool = False
+    thread: Optional[str] = None
+    reply_to: Optional[str] = None
+    task_status: Optional[str] = None  # working/done, set on Claude inbox tasks
+    to_claude: bool = False  # Set by views listing the -claude inbox
+    inbox: str = ""
+
+
+by_id = attrgetter("id")
+
+
+def message_blocks(content: str):
+    """Yield the text after each "\\n* MESSAGE " marker, without splitting the whole file."""
+    marker = "\n* MESSAGE "
+    start = content.find(marker)
+    while start >= 0:
+        start += len(marker)
+        end = content.find(marker, start)
+        yield content[start:end if end >= 0 else None]
+        start = end
+
+
+def parse_message(block: str) -> Optional[ParsedMsg]:
+    """Parse a MESSAGE block (text after "* MESSAGE ") by slicing, without splitting lines."""
+    header, _, rest = block.partition("\n")
+
+    # [2026-01-15 Thu 14:30] -> 14:30
+    time_str = ""
+    open_at = header.find("[")
+    close_at = header.find("]", open_at + 1)
+    if open_at >= 0 and close_at > open_at:
+        stamp = header[open_at + 1:close_at].rsplit(" ", 1)
+        if len(stamp) == 2 and ":" in stamp[1]:
+            time_str = stamp[1]
+
+    # Drop the :PROPERTIES: and :END: lines; text may sit on either side
+    before, found, after = rest.partition(":PROPERTIES:")
+    if found:
+        drawer, _, body = after.partition(":END:")
+        body = before.rpartition("\n")[0] + "\n" + body.partition("\n")[2]
+    else:
+        drawer, body = "", rest
+
+    # Drop blank lines in one regex pass; most bodies have none
+    text = BLANK_LINES_RE.sub("\n", body.strip())
+
+    # One regex pass over the drawer instead of a scan per property
+    props = dict(ORG_PROPERTY_RE.findall(drawer)) if drawer else {}
+    return ParsedMsg(
+        id=props.get("ID") or "",
+        sender=props.get("FROM") or "?",
+        text=text,
+        time=time_str,
+        unread=":unread:" in header,
+        todo=":todo:" in header,
+        done=":done:" in header,
+        thread=props.get("THREAD"),
+        reply_to=props.get("REPLY_TO"),
+        task_status=props.get("TASK_STATUS"),
+    )
+
+
+def find_message_header(content: str, msg_id: str) -> Optional[tuple[int, int]]:
+    """Offsets of the MESSAGE header and the :ID: line of the block whose id contains msg_id."""
+    pos = content.find(msg_id)
+    while pos >= 0:
+        line_start = content.rfind("\n", 0, pos) + 1
+        if content.startswith(":ID:", line_start):
+            break
+        pos = content.find(msg_id, pos + 1)
+    if pos < 0:
+        return None
+    header_start = content.rfind("\n* MESSAGE [", 0, line_start) + 1
+    if not header_start and not content.startswith("* MESSAGE ["):
+        return None
+    return header_start, line_start
+
+
+# Status glyph and colour per message state, and what a click moves it to
+STATUS_GLYPHS = {
+    "unread": ("●", "#f48771", "Click to mark as TODO"),
+    "todo": ("☐", "#dcdcaa", "Click to mark as done"),
+    "done": ("✓", "#4ec9b0", "Click to clear"),
+    "read": ("○", "#666", "Click to mark as TODO"),
+}
+NEXT_STATUS = {"unread": "todo", "todo": "done", "done": "read", "read": "todo"}
+
+# Stream message header; fields are escaped since sender and time come from inbox files
+MESSAGE_HEADER_HTML = "<span style='color:{color}; font-weight:bold;'>@{sender}</span> <span style='color:#666;'>{time}</span>"
+
+# Labels pick a colour through their "tone" property and the window-level rules
+# below, so no label carries (and makes Qt parse) a stylesheet of its own.
+# Labels with an objectName get their size from an #id rule, which outranks tone.
+STREAM_TONES = ("#d4d4d4", "#4ec9b0", "#666", "#c586c0", "#dcdcaa", "#f48771")
+STATUS_DOT_COLORS = {"online": "#4ec9b0", "busy": "#f48771", "away": "#dcdcaa", "focusing": "#c586c0"}
+
+WINDOW_QSS = """
+    QMainWindow { background-color: #1e1e1e; }
+    QLabel { color: #d4d4d4; }
+    QTextEdit { background-color: #1e1e1e; color: #d4d4d4; border: none; font-family: Menlo; font-size: 12px; }
+    QLineEdit { background-color: #333; color: #fff; border: 1px solid #555; border-radius: 4px; padding: 8px; font-family: Menlo; font-size: 12px; }
+    QLineEdit:focus { border: 1px solid #569cd6; }
+""" + "\n".join(
+    [f'QLabel[tone="{color}"] {{ color: {color}; font-size: 12px; }}' for color in STREAM_TONES]
+    + ['QLabel[bold="true"] { font-weight: bold; }',
+       "QLabel#userLabel { color: #569cd6; font-weight: bold; font-size: 13px; }",
+       "QLabel#statusDot { font-size: 13px; }",
+       "QLabel#onlineLabel, QLabel#relayLabel, QLabel#statusLabel { font-size: 11px; }",
+       "QLabel#onlineLabel { color: #666; }",
+       "QLabel#listHeader { font-size: 12px; font-weight: bold; }"])
+
+
+def set_tone(label: QLabel, color: str):
+    """Recolour a label through the window stylesheet, re-polishing instead of re-parsing."""
+    if color not in STREAM_TONES:
+        label.setStyleSheet(f"color: {color};")
+        return
+    if label.property("tone") == color and not label.styleSheet():
+        return
+    label.setStyleSheet("")
+    label.setProperty("tone", color)
+    label.style().unpolish(label)
+    label.style().polish(label)
+
+
+_CLOCK_CACHE = (-1, "")  # (minutes since epoch, "HH:MM")
+
+
+def hhmm_now() -> str:
+    """Local time as "HH:MM", formatted at most once a minute."""
+    global _CLOCK_CACHE
+    now = time.time()
+    minute = int(now // 60)
+    cached = _CLOCK_CACHE
+    if cached[0] != minute:
+        # One tuple swap, so the relay thread never sees a torn pair
+        cached = _CLOCK_CACHE = (minute, time.strftime("%H:%M", time.localtime(now)))
+    return cached[1]
+
+
+@lru_cache(maxsize=1024)
+def sender_color(sender: str) -> str:
+    """Stream colour for a sender: you, a Claude agent, or anyone else."""
+    if sender.startswith("you→"):
+        return "#4ec9b0"
+    if sender == "claude" or sender.endswith("-claude"):
+        return "#c586c0"
+    return "#569cd6"
+
+
+def message_status(msg: ParsedMsg) -> str:
+    """unread, todo, done or read, from a parsed message's tag flags."""
+    if msg.unread:
+        return "unread"
+    if msg.todo:
+        return "todo"
+    if msg.done:
+        return "done"
+    return "read"
+
+
+class MessageListModel(QAbstractListModel):
+    """ParsedMsgs shown by the list view, handed to it a page at a time as it scrolls."""
+    MessageRole = Qt.ItemDataRole.UserRole
+    PAGE = 100
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._messages: list[ParsedMsg] = []
+        self._loaded = 0  # Rows the view knows about
 
-        # Message content (middle)
-        content = QVBoxLayout()
-        content.setSpacing(2)
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
 
-        # Header: sender + time
-        header = QHBoxLayout()
-        sender = msg_data.get("from", "?")
-        sender_label = QLabel(f"@{sender}")
-        sender_color = "#c586c0" if sender.endswith("-claude") else "#569cd6"
-        sender_label.setStyleSheet(f"color: {sender_color}; font-weight: bold; font-size: 12px;")
-        header.addWidget(sender_label)
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < len(self._messages)
 
-        if msg_data.get("to_claude"):
-            claude_label = QLabel("→claude")
-            claude_label.setStyleSheet("color: #c586c0; font-size: 11px;")
-            header.addWidget(claude_label)
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.PAGE, len(self._messages) - self._loaded)
+        if count > 0:
+            self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+            self._loaded += count
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        msg = self._messages[index.row()]
+        if role == self.MessageRole:
+            return msg
+        if role == Qt.ItemDataRole.DisplayRole:
+            return msg.text
+        return None
 
-        header.addStretch()
+    def set_messages(self, messages: list):
+        self.beginResetModel()
+        self._messages = list(messages)
+        self._loaded = min(self.PAGE, len(self._messages))
+        self.endResetModel()
+
+    def set_status(self, row: int, status: str):
+        """Show a message as unread/todo/done/read without re-reading the inbox."""
+        msg = self._messages[row]
+        msg.unread = status == "unread"
+        msg.todo = status == "todo"
+        msg.done = status == "done"
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def remove_message(self, msg_id: str):
+        for row, msg in enumerate(self._messages):
+            if msg.id == msg_id:
+                if row >= self._loaded:
+                    del self._messages[row]  # Not fetched yet, so not in the view
+                    return
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._messages[row]
+                self._loaded -= 1
+                self.endRemoveRows()
+                return
 
-        time_label = QLabel(msg_data.get("time", ""))
-        time_label.setStyleSheet("color: #666; font-size: 11px;")
-        header.addWidget(time_label)
 
-        content.addLayout(header)
+class MessageDelegate(QStyledItemDelegate):
+    """Paints a message row (status glyph, sender, time, text, delete) and handles its clicks.
 
-        # Message text
-        text = msg_data.get("text", "")[:150]
-        text_label = QLabel(text)
-        text_label.setWordWrap(True)
-        text_label.setStyleSheet("color: #d4d4d4; font-size: 12px;")
-        content.addWidget(text_label)
+    Only visible rows are painted, so a long /mine or /todos list costs no
+    widgets per message.
+    """
+    status_clicked = pyqtSignal(str, str)  # msg_id, current_status
+    delete_clicked = pyqtSignal(str)  # msg_id
 
-        layout.addLayout(content, stretch=1)
+    PAD_X, PAD_Y, BUTTON, GAP, MARGIN = 8, 6, 24, 8, 2
+    TEXT_LIMIT = 150
+    STATIC_CACHE_MAX = 1024
+
+    def __init__(self, view: QListView):
+        super().__init__(view)
+        self.view = view
+        self.body_font = QFont(view.font())
+        self.body_font.setPixelSize(12)
+        self.sender_font = QFont(self.body_font)
+        self.sender_font.setBold(True)
+        self.meta_font = QFont(view.font())
+        self.meta_font.setPixelSize(11)
+        self.glyph_font = QFont(view.font())
+        self.glyph_font.setPixelSize(16)
+        self.header_height = max(QFontMetrics(self.sender_font).height(),
+                                 QFontMetrics(self.meta_font).height())
+        # Laid-out bodies by (text, width), shared by sizeHint and paint
+        self._static: dict[tuple[str, int], QStaticText] = {}
+        self._labels: dict[tuple[str, bool], QStaticText] = {}  # Header sender/time text
+
+    def _rects(self, rect: QRect) -> tuple[QRect, QRect, QRect]:
+        """Status button, content and delete button areas of one row."""
+        card = rect.adjusted(self.PAD_X, self.MARGIN + self.PAD_Y, -self.PAD_X, -self.MARGIN - self.PAD_Y)
+        status = QRect(card.left(), card.top(), self.BUTTON, self.BUTTON)
+        delete = QRect(card.right() - self.BUTTON + 1, card.top(), self.BUTTON, self.BUTTON)
+        content = card.adjusted(self.BUTTON + self.GAP, 0, -self.BUTTON - self.GAP, 0)
+        return status, content, delete
+
+    def _text(self, msg: ParsedMsg) -> str:
+        return msg.text[:self.TEXT_LIMIT]
+
+    def _glyph(self, glyph: str, color: str) -> QPixmap:
+        """A button glyph rendered once into a pixmap, shared through QPixmapCache."""
+        ratio = self.view.devicePixelRatioF()
+        key = f"datacore-msg-glyph:{glyph}:{color}:{ratio}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None:
+            size = round(self.BUTTON * ratio)
+            pixmap = QPixmap(size, size)
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            glyph_painter = QPainter(pixmap)
+            glyph_painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+            glyph_painter.setFont(self.glyph_font)
+            glyph_painter.setPen(QColor(color))
+            glyph_painter.drawText(QRect(0, 0, self.BUTTON, self.BUTTON), Qt.AlignmentFlag.AlignCenter, glyph)
+            glyph_painter.end()
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def _body(self, msg: ParsedMsg, width: int) -> QStaticText:
+        """Wrapped body text, laid out once per text and width."""
+        key = (self._text(msg), width)
+        static = self._static.get(key)
+        if static is None:
+            if len(self._static) >= self.STATIC_CACHE_MAX:
+                self._static.clear()
+            # Plain-text QStaticText ignores "\n"; a line separator breaks the line
+            static = QStaticText(key[0].replace("\n", "\u2028"))
+            static.setTextFormat(Qt.TextFormat.PlainText)
+            static.setTextWidth(width)
+            static.prepare(font=self.body_font)
+            self._static[key] = static
+        return static
+
+    def _label(self, text: str, font: QFont) -> QStaticText:
+        """One line of header text (sender, time), laid out once."""
+        key = (text, font is self.sender_font)
+        static = self._labels.get(key)
+        if static is None:
+            if len(self._labels) >= self.STATIC_CACHE_MAX:
+                self._labels.clear()
+            static = QStaticText(text)
+            static.setTextFormat(Qt.TextFormat.PlainText)
+            static.prepare(font=font)
+            self._labels[key] = static
+        return static
+
+    def _draw_label(self, painter, header: QRect, x: float, static: QStaticText):
+        """Draw header text at x, centred vertically in the header line."""
+        painter.drawStaticText(QPointF(x, header.top() + (header.height() - static.size().height()) / 2), static)
+
+    def sizeHint(self, option, index) -> QSize:
+        width = self.view.viewport().width()
+        text_width = max(width - 2 * self.PAD_X - 2 * (self.BUTTON + self.GAP), 40)
+        body = self._body(index.data(MessageListModel.MessageRole), text_width)
+        content = self.header_height + 2 + math.ceil(body.size().height())
+        return QSize(width, max(content, self.BUTTON) + 2 * (self.PAD_Y + self.MARGIN))
+
+    def paint(self, painter, option, index):
+        msg = index.data(MessageListModel.MessageRole)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#2d2d2d" if hovered else "#252526"))
+        painter.drawRoundedRect(QRectF(option.rect.adjusted(0, self.MARGIN, 0, -self.MARGIN)), 4, 4)
+
+        status_rect, content, delete_rect = self._rects(option.rect)
+        glyph, color, _ = STATUS_GLYPHS[message_status(msg)]
+        painter.drawPixmap(status_rect.topLeft(), self._glyph(glyph, color))
+        painter.drawPixmap(delete_rect.topLeft(), self._glyph("×", "#666"))
+
+        # Header: sender (+ →claude) on the left, time on the right
+        header = QRect(content.left(), content.top(), content.width(), self.header_height)
+        sender = msg.sender
+        painter.setFont(self.sender_font)
+        painter.setPen(QColor("#c586c0" if sender.endswith("-claude") else "#569cd6"))
+        sender_text = self._label("@" + sender, self.sender_font)
+        self._draw_label(painter, header, header.left(), sender_text)
+        painter.setFont(self.meta_font)
+        if msg.to_claude:
+            painter.setPen(QColor("#c586c0"))
+            self._draw_label(painter, header, header.left() + sender_text.size().width() + 6,
+                             self._label("→claude", self.meta_font))
+        painter.setPen(QColor("#666"))
+        time_text = self._label(msg.time, self.meta_font)
+        self._draw_label(painter, header, header.right() + 1 - time_text.size().width(), time_text)
+
+        body = content.adjusted(0, self.header_height + 2, 0, 0)
+        painter.setFont(self.body_font)
+        painter.setPen(QColor("#d4d4d4"))
+        painter.drawStaticText(body.topLeft(), self._body(msg, max(body.width(), 40)))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        if (event.type() != QEvent.Type.MouseButtonRelease
+                or event.button() != Qt.MouseButton.LeftButton):
+            return False
+        status_rect, _, delete_rect = self._rects(option.rect)
+        pos = event.position().toPoint()
+        msg = index.data(MessageListModel.MessageRole)
+        if status_rect.contains(pos):
+            status = message_status(msg)
+            # Cycle visually right away; the window updates the org file
+            model.set_status(index.row(), NEXT_STATUS[status])
+            self.status_clicked.emit(msg.id, status)
+            return True
+        if delete_rect.contains(pos):
+            self.delete_clicked.emit(msg.id)
+            return True
+        return False
 
-        # Delete button (right side)
-        self.delete_btn = QPushButton("×")
-        self.delete_btn.setFixedSize(24, 24)
-        self.delete_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.delete_btn.setStyleSheet("""
-            QPushButton { background: transparent; color: #666; font-size: 16px; border: none; }
-            QPushButton:hover { color: #f48771; }
-        """)
-        self.delete_btn.clicked.connect(self._on_delete_click)
-        layout.addWidget(self.delete_btn)
-
-    def _update_status_button(self):
-        """Update button appearance based on message status."""
-        if self.msg_data.get("unread"):
-            self.status_btn.setText("●")
-            self.status_btn.setStyleSheet("""
-                QPushButton { background: transparent; color: #f48771; font-size: 16px; border: none; }
-                QPushButton:hover { color: #dcdcaa; }
-            """)
-            self.status_btn.setToolTip("Click to mark as TODO")
-        elif self.msg_data.get("todo"):
-            self.status_btn.setText("☐")
-            self.status_btn.setStyleSheet("""
-                QPushButton { background: transparent; color: #dcdcaa; font-size: 16px; border: none; }
-                QPushButton:hover { color: #4ec9b0; }
-            """)
-            self.status_btn.setToolTip("Click to mark as done")
-        elif self.msg_data.get("done"):
-            self.status_btn.setText("✓")
-            self.status_btn.setStyleSheet("""
-                QPushButton { background: transparent; color: #4ec9b0; font-size: 16px; border: none; }
-                QPushButton:hover { color: #666; }
-            """)
-            self.status_btn.setToolTip("Click to clear")
-        else:
-            self.status_btn.setText("○")
-            self.status_btn.setStyleSheet("""
-                QPushButton { background: transparent; color: #666; font-size: 16px; border: none; }
-                QPushButton:hover { color: #dcdcaa; }
-            """)
-            self.status_btn.setToolTip("Click to mark as TODO")
-
-    def _on_status_click(self):
-        status = "unread" if self.msg_data.get("unread") else \
-                 "todo" if self.msg_data.get("todo") else \
-                 "done" if self.msg_data.get("done") else "read"
-
-        # Cycle visual status immediately
-        self._cycle_status_visual()
-
-        # Emit signal to update the org file
-        self.status_clicked.emit(self.msg_id, status)
-
-    def _cycle_status_visual(self):
-        """Cycle to next status visually."""
-        # Update internal data
-        if self.msg_data.get("unread"):
-            self.msg_data["unread"] = False
-            self.msg_data["todo"] = True
-        elif self.msg_data.get("todo"):
-            self.msg_data["todo"] = False
-            self.msg_data["done"] = True
-        elif self.msg_data.get("done"):
-            self.msg_data["done"] = False
+    def helpEvent(self, event, view, option, index) -> bool:
+        status_rect, _, delete_rect = self._rects(option.rect)
+        if status_rect.contains(event.pos()):
+            tip = STATUS_GLYPHS[message_status(index.data(MessageListModel.MessageRole))][2]
+        elif delete_rect.contains(event.pos()):
+            tip = "Delete message"
         else:
-            self.msg_data["todo"] = True
-        # Update button appearance
-        self._update_status_button()
+            return super().helpEvent(event, view, option, index)
+        QToolTip.showText(event.globalPos(), tip, view)
+        return True
 
-    def _on_delete_click(self):
-        self.delete_clicked.emit(self.msg_id)
+
+@dataclass(slots=True)
+class MessageDTO:
+    """A message on its way to the stream, possibly from the relay thread."""
+    sender: str
+    text: str
+    time_str: str
+    unread: bool = False
+    priority: str = "normal"
+    via_relay: bool = False
 
 
 class SignalBridge(QObject):
-    message_received = pyqtSignal(str, str, str, bool, str, bool)
+    messages_received = pyqtSignal(list)  # list[MessageDTO], one emit per burst
     status_changed = pyqtSignal(str)
     presence_changed = pyqtSignal(list, dict)  # online list, statuses dict
+    inbox_written = pyqtSignal(object, object, object, list)  # inbox, stat before, after, entries
+    inboxes_parsed = pyqtSignal(list)  # [(inbox, mtime_ns, size, messages)] from InboxParseTask
+
+
+class InboxParseTask(QRunnable):
+    """Reads and parses inbox files on a pool thread, posting the results through the bridge."""
+
+    def __init__(self, inboxes: list, bridge: SignalBridge):
+        super().__init__()
+        self.inboxes = inboxes
+        self.bridge = bridge
+
+    def run(self):
+        results = []
+        for inbox in self.inboxes:
+            try:
+                st = inbox.stat()  # Before reading: a later write just looks stale
+            except OSError:
+                continue  # Gone; _parse_in_background skips it too
+            try:
+                content = inbox.read_text()
+            except (OSError, ValueError):
+                # Cache an unreadable inbox as empty under its stat key, so
+                # the caller doesn't see it stale and re-queue it forever
+                results.append((inbox, st.st_mtime_ns, st.st_size, []))
+                continue
+            messages = [msg for msg in map(parse_message, message_blocks(content)) if msg]
+            results.append((inbox, st.st_mtime_ns, st.st_size, messages))
+        self.bridge.inboxes_parsed.emit(results)
 
 
 class MessageWindow(QMainWindow):
@@ -468,19 +1357,35 @@ class MessageWindow(QMainWindow):
 
         self.username = get_username()
         self.default_space = get_default_space()
-        self.seen_ids = set()
+        self.seen_ids = BoundedSet(SEEN_IDS_MAX)
+        self._inbox_cache: Optional[tuple[float, list[Path]]] = None  # scanned_at, paths
+        self._inbox_state: dict[Path, tuple[int, int, int]] = {}  # mtime_ns, size, last MESSAGE offset
+        self._parsed_cache: dict[Path, tuple[int, int, list[ParsedMsg]]] = {}  # mtime_ns, size, parsed messages
+        self._msg_inboxes: dict[str, Path] = {}  # msg id -> inbox it was last parsed from
         self.host_relay = host_relay
         self.relay = None
         self.relay_client_ws = None
+        self._relay_binary = False  # relay_client_ws negotiated msgpack frames
         self.relay_connected = False
+        self._relay_loop = None  # asyncio loop owned by the relay thread
+        self._relay_batch: list = []  # MessageDTOs received but not yet emitted
+        self.watcher = None
+        self.poll_timer = None  # Only on network mounts or when watches run out
         self.current_view = "mine"  # Track current view: "mine" or "todos"
         self.my_status = "online"  # Current user's status
         self.user_statuses = {}  # {username: status} for online users
         self.bridge = SignalBridge()
 
-        self.bridge.message_received.connect(self.add_message)
+        self.bridge.messages_received.connect(self.add_messages)
         self.bridge.status_changed.connect(self.update_relay_status)
         self.bridge.presence_changed.connect(self.update_presence)
+        self.bridge.inbox_written.connect(self._on_inbox_written)
+        self.bridge.inboxes_parsed.connect(self._on_inboxes_parsed)
+        self._after_parse = None  # View to show once background parsing finishes
+        self._parsing = False  # An InboxParseTask is in flight
+
+        self.inbox_writer = InboxWriter(self.bridge.inbox_written.emit)
+        self.inbox_writer.start()
 
         self._setup_ui()
         self._load_existing_messages()
@@ -492,13 +1397,7 @@ class MessageWindow(QMainWindow):
         self.setGeometry(100, 100, 350, 500)
         self.setWindowFlags(self.windowFlags() | Qt.WindowType.WindowStaysOnTopHint)
 
-        self.setStyleSheet("""
-            QMainWindow { background-color: #1e1e1e; }
-            QLabel { color: #d4d4d4; }
-            QTextEdit { background-color: #1e1e1e; color: #d4d4d4; border: none; font-family: Menlo; font-size: 12px; }
-            QLineEdit { background-color: #333; color: #fff; border: 1px solid #555; border-radius: 4px; padding: 8px; font-family: Menlo; font-size: 12px; }
-            QLineEdit:focus { border: 1px solid #569cd6; }
-        """)
+        self.setStyleSheet(WINDOW_QSS)
 
         central = QWidget()
         self.setCentralWidget(central)
@@ -509,20 +1408,22 @@ class MessageWindow(QMainWindow):
         # Header
         header = QHBoxLayout()
         self.user_label = QLabel(f"@{self.username}")
-        self.user_label.setStyleSheet("color: #569cd6; font-weight: bold; font-size: 13px;")
+        self.user_label.setObjectName("userLabel")
         header.addWidget(self.user_label)
 
         self.status_dot = QLabel(" ●")
-        self.status_dot.setStyleSheet("color: #4ec9b0; font-size: 13px;")
+        self.status_dot.setObjectName("statusDot")
+        self.status_dot.setProperty("tone", STATUS_DOT_COLORS["online"])
         header.addWidget(self.status_dot)
         header.addStretch()
 
         self.online_label = QLabel("")
-        self.online_label.setStyleSheet("color: #666; font-size: 11px;")
+        self.online_label.setObjectName("onlineLabel")
         header.addWidget(self.online_label)
 
         self.relay_label = QLabel("(connecting...)")
-        self.relay_label.setStyleSheet("color: #c586c0; font-size: 11px;")
+        self.relay_label.setObjectName("relayLabel")
+        self.relay_label.setProperty("tone", "#c586c0")
         header.addWidget(self.relay_label)
 
         layout.addLayout(header)
@@ -540,9 +1441,46 @@ class MessageWindow(QMainWindow):
         self.stream_layout = QVBoxLayout(self.stream_widget)
         self.stream_layout.setContentsMargins(8, 8, 8, 8)
         self.stream_layout.setSpacing(4)
+        # One scroll per burst of stream inserts, once the layout has settled
+        self.scroll_timer = QTimer(self)
+        self.scroll_timer.setSingleShot(True)
+        self.scroll_timer.setInterval(10)
+        self.scroll_timer.timeout.connect(lambda: self.stream_scroll.verticalScrollBar().setValue(
+            self.stream_scroll.verticalScrollBar().maximum()))
         self.stream_layout.addStretch()
         self.stream_scroll.setWidget(self.stream_widget)
-        layout.addWidget(self.stream_scroll, stretch=1)
+
+        # Message list for /mine and /todos, swapped in over the stream
+        list_page = QWidget()
+        list_layout = QVBoxLayout(list_page)
+        list_layout.setContentsMargins(8, 8, 8, 8)
+        list_layout.setSpacing(4)
+        self.list_header = QLabel()
+        self.list_header.setObjectName("listHeader")
+        list_layout.addWidget(self.list_header)
+        self.message_model = MessageListModel(self)
+        self.message_list = QListView()
+        self.message_list.setModel(self.message_model)
+        self.message_list.setMouseTracking(True)  # Row hover highlight
+        self.message_list.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.message_list.setResizeMode(QListView.ResizeMode.Adjust)  # Re-wrap on resize
+        self.message_list.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.message_list.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.message_list.setStyleSheet("""
+            QListView { background-color: #1e1e1e; border: none; }
+            QScrollBar:vertical { background: #1e1e1e; width: 8px; }
+            QScrollBar::handle:vertical { background: #555; border-radius: 4px; }
+        """)
+        self.message_delegate = MessageDelegate(self.message_list)
+        self.message_delegate.status_clicked.connect(self._on_status_change)
+        self.message_delegate.delete_clicked.connect(self._on_delete_message)
+        self.message_list.setItemDelegate(self.message_delegate)
+        list_layout.addWidget(self.message_list, stretch=1)
+
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.stream_scroll)
+        self.view_stack.addWidget(list_page)
+        layout.addWidget(self.view_stack, stretch=1)
 
         # Separator
         sep = QFrame()
@@ -559,46 +1497,79 @@ class MessageWindow(QMainWindow):
         # Status
         mode = "hosting" if self.host_relay else "client"
         self.status_label = QLabel(f"Space: {self.default_space} ({mode})")
-        self.status_label.setStyleSheet("color: #666; font-size: 11px;")
+        self.status_label.setObjectName("statusLabel")
+        self.status_label.setProperty("tone", "#666")
         layout.addWidget(self.status_label)
 
         # Position
         screen = QApplication.primaryScreen().geometry()
         self.move(screen.width() - 370, 40)
 
+    def _show_stream(self):
+        """Swap the message list out for the stream."""
+        self.view_stack.setCurrentWidget(self.stream_scroll)
+
+    def _show_message_list(self, header: str, color: str, messages: list):
+        """Show messages in the list view under a header line."""
+        self.list_header.setText(header)
+        set_tone(self.list_header, color)
+        self.message_model.set_messages(messages)
+        self.view_stack.setCurrentIndex(1)
+        self.message_list.scrollToTop()
+
+    def _flash_status(self, text: str, color: str):
+        """Show feedback in the status bar for a few seconds."""
+        mode = "hosting" if self.host_relay else "client"
+        set_tone(self.status_label, color)
+        self.status_label.setText(text)
+        QTimer.singleShot(3000, lambda: (
+            set_tone(self.status_label, "#666"),
+            self.status_label.setText(f"Space: {self.default_space} ({mode})")
+        ))
+
     def _add_text_to_stream(self, text: str, color: str = "#d4d4d4", bold: bool = False):
         """Add a text label to the stream."""
         label = QLabel(text)
-        style = f"color: {color}; font-size: 12px;"
+        # Command output quotes message text and names; never sniff it for HTML
+        label.setTextFormat(Qt.TextFormat.PlainText)
+        if color in STREAM_TONES:
+            label.setProperty("tone", color)
+        else:
+            label.setStyleSheet(f"color: {color}; font-size: 12px;")
         if bold:
-            style += " font-weight: bold;"
-        label.setStyleSheet(style)
+            label.setProperty("bold", True)
         label.setWordWrap(True)
         # Insert before the stretch
         self.stream_layout.insertWidget(self.stream_layout.count() - 1, label)
         self._scroll_to_bottom()
 
-    def _add_widget_to_stream(self, widget):
-        """Add any widget to the stream."""
-        self.stream_layout.insertWidget(self.stream_layout.count() - 1, widget)
-        self._scroll_to_bottom()
-
     def _scroll_to_bottom(self):
-        """Scroll stream to bottom."""
-        QTimer.singleShot(10, lambda: self.stream_scroll.verticalScrollBar().setValue(
-            self.stream_scroll.verticalScrollBar().maximum()))
+        """Scroll stream to bottom (coalesced with other requests this turn)."""
+        if not self.scroll_timer.isActive():
+            self.scroll_timer.start()
 
     def add_message(self, sender: str, text: str, time_str: str,
                     unread: bool = False, priority: str = "normal", via_relay: bool = False):
         """Add a simple text message to the stream."""
-        # Determine sender color
-        if sender.startswith("you→"):
-            sender_color = "#4ec9b0"
-        elif sender == "claude" or sender.endswith("-claude"):
-            sender_color = "#c586c0"
-        else:
-            sender_color = "#569cd6"
+        self.add_messages([MessageDTO(sender, text, time_str, unread, priority, via_relay)])
+
+    def add_messages(self, messages: list):
+        """Add a batch of MessageDTOs to the stream with one relayout and scroll."""
+        if not messages:
+            return
+        self.stream_widget.setUpdatesEnabled(False)
+        for msg in messages:
+            self.stream_layout.insertWidget(self.stream_layout.count() - 1, self._message_widget(msg))
+        self.stream_widget.setUpdatesEnabled(True)
+        self._scroll_to_bottom()
 
+        if any(msg.unread for msg in messages):
+            self._show_stream()
+            self.raise_()
+            self.activateWindow()
+
+    def _message_widget(self, msg: MessageDTO) -> QWidget:
+        """Build the stream widget for one message."""
         # Build message widget
         msg_widget = QWidget()
         msg_layout = QHBoxLayout(msg_widget)
@@ -606,38 +1577,37 @@ class MessageWindow(QMainWindow):
         msg_layout.setSpacing(8)
 
         # Status indicator
-        if unread:
+        if msg.unread:
             dot = QLabel("●")
-            dot.setStyleSheet("color: #f48771; font-size: 12px;")
+            dot.setProperty("tone", "#f48771")
             dot.setFixedWidth(16)
             msg_layout.addWidget(dot)
         else:
-            spacer = QLabel("")
-            spacer.setFixedWidth(16)
-            msg_layout.addWidget(spacer)
+            # Dot width plus the gap the dot gets; aligns text without a widget
+            msg_layout.addSpacing(16 + msg_layout.spacing())
 
         # Content
         content = QVBoxLayout()
         content.setSpacing(2)
 
-        header = QLabel(f"<span style='color:{sender_color}; font-weight:bold;'>@{sender}</span> <span style='color:#666;'>{time_str}</span>")
+        header = QLabel(MESSAGE_HEADER_HTML.format(
+            color=sender_color(msg.sender), sender=html.escape(msg.sender), time=html.escape(msg.time_str)))
+        header.setTextFormat(Qt.TextFormat.RichText)
         content.addWidget(header)
 
-        body = QLabel(text[:200])
-        body.setStyleSheet("color: #d4d4d4; font-size: 12px;")
+        # Plain text: skips rich-text sniffing and shows markup in messages literally
+        body = QLabel(msg.text[:200])
+        body.setTextFormat(Qt.TextFormat.PlainText)
+        body.setProperty("tone", "#d4d4d4")
         body.setWordWrap(True)
         content.addWidget(body)
 
         msg_layout.addLayout(content, stretch=1)
-        self._add_widget_to_stream(msg_widget)
-
-        if unread:
-            self.raise_()
-            self.activateWindow()
+        return msg_widget
 
     def update_relay_status(self, status: str):
         color = "#4ec9b0" if "●" in status else "#c586c0"
-        self.relay_label.setStyleSheet(f"color: {color}; font-size: 11px;")
+        set_tone(self.relay_label, color)
         self.relay_label.setText(f"({status})")
 
     def update_presence(self, online: list, statuses: dict = None):
@@ -650,9 +1620,12 @@ class MessageWindow(QMainWindow):
         cmd_name = parts[0].lower()
 
         if cmd_name in ("/mine", "/my-messages", "/messages", "/inbox"):
+            # Cleared here: the list may only show once inboxes are parsed
+            self.input_field.clear()
             self._show_my_messages()
             return True
         elif cmd_name == "/todos":
+            self.input_field.clear()
             self._show_todo_messages()
             return True
         elif cmd_name == "/todo" and len(parts) >= 2:
@@ -668,11 +1641,13 @@ class MessageWindow(QMainWindow):
             self._mark_message_by_id(parts[1], "clear")
             return True
         elif cmd_name == "/clear":
-            # Clear all widgets from stream except the stretch
-            while self.stream_layout.count() > 1:
-                item = self.stream_layout.takeAt(0)
+            # Clear all widgets from stream except the stretch (the last item).
+            # Taken from the end: takeAt(0) shifts every remaining item each time
+            for i in range(self.stream_layout.count() - 2, -1, -1):
+                item = self.stream_layout.takeAt(i)
                 if item.widget():
                     item.widget().deleteLater()
+            self.message_model.set_messages([])
             self.input_field.clear()
             return True
         elif cmd_name == "/relay":
@@ -716,71 +1691,56 @@ class MessageWindow(QMainWindow):
         # Show confirmation
         if success:
             action_labels = {"todo": "→ TODO", "done": "→ Done", "clear": "→ Cleared"}
-            self._add_text_to_stream(f"  ✓ {action_labels.get(new_action, new_action)}", "#4ec9b0")
+            self._flash_status(f"✓ {action_labels.get(new_action, new_action)}", "#4ec9b0")
         else:
-            self._add_text_to_stream(f"  ✗ Failed to update", "#f48771")
+            self._flash_status("✗ Failed to update", "#f48771")
 
     def _on_delete_message(self, msg_id: str):
         """Handle delete button click - remove message from org file."""
-        import re
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}*.org"):
+        for inbox in self._inboxes_for(msg_id):
             try:
                 content = inbox.read_text()
-                if msg_id not in content:
+                found = find_message_header(content, msg_id)
+                if not found:
                     continue
-                # Remove the entire MESSAGE block
-                pattern = rf'\n\* MESSAGE \[[^\]]+\][^\n]*\n:PROPERTIES:.*?:ID: {re.escape(msg_id)}.*?:END:\n.*?(?=\n\* |\Z)'
-                new_content = re.sub(pattern, '', content, flags=re.DOTALL)
-                if new_content != content:
-                    inbox.write_text(new_content)
-                    self._add_text_to_stream("  ✓ Deleted", "#f48771")
-                    break
-            except:
-                pass
+                # Remove the entire MESSAGE block, up to the next heading
+                start, line_start = found
+                end = content.find("\n* ", line_start)
+                inbox.write_text(content[:max(start - 1, 0)] + (content[end:] if end >= 0 else ""))
+            except (OSError, ValueError):
+                continue
+            self._parsed_cache.pop(inbox, None)
+            self.message_model.remove_message(msg_id)
+            self._flash_status("✓ Deleted", "#f48771")
+            break
 
     def _show_my_messages(self):
         """Show all unread messages for current user - appends to stream."""
         self.current_view = "mine"
 
+        inboxes = self._inbox_paths(f"{self.username}.org")
+        claude_inboxes = self._inbox_paths(f"{self.username}-claude.org")
+        if self._parse_in_background(inboxes + claude_inboxes, self._show_my_messages):
+            return
+
         messages = []
 
         # Check all inboxes for this user
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}.org"):
-            try:
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message(block)
-                    if msg and msg.get("unread"):
-                        messages.append(msg)
-            except:
-                pass
+        for inbox in inboxes:
+            messages += [replace(msg) for msg in self._inbox_messages(inbox) if msg.unread]
 
         # Also check claude inbox
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}-claude.org"):
-            try:
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message(block)
-                    if msg and msg.get("unread"):
-                        msg["to_claude"] = True
-                        messages.append(msg)
-            except:
-                pass
-
-        # Add header to stream
-        self._add_text_to_stream(f"─── {len(messages)} unread ───", "#c586c0", bold=True)
+        for inbox in claude_inboxes:
+            messages += [replace(msg, to_claude=True)
+                         for msg in self._inbox_messages(inbox) if msg.unread]
 
+        header = f"─── {len(messages)} unread ───"
         if messages:
-            for msg in sorted(messages, key=lambda m: m.get("id", "")):
-                row = MessageRow(msg)
-                row.status_clicked.connect(self._on_status_change)
-                row.delete_clicked.connect(self._on_delete_message)
-                self._add_widget_to_stream(row)
+            self._show_message_list(header, "#c586c0", sorted(messages, key=by_id))
         else:
+            self._add_text_to_stream(header, "#c586c0", bold=True)
             self._add_text_to_stream("  No unread messages", "#4ec9b0")
 
-        self.input_field.clear()
-
     def _show_help(self):
         """Show available commands."""
         self._add_text_to_stream("─── Commands ───", "#c586c0", bold=True)
@@ -859,8 +1819,7 @@ class MessageWindow(QMainWindow):
         icon = status_icons.get(new_status, "⚪")
 
         # Update local status dot color
-        dot_colors = {"online": "#4ec9b0", "busy": "#f48771", "away": "#dcdcaa", "focusing": "#c586c0"}
-        self.status_dot.setStyleSheet(f"color: {dot_colors.get(new_status, '#4ec9b0')}; font-size: 13px;")
+        set_tone(self.status_dot, STATUS_DOT_COLORS[new_status])
 
         self._add_text_to_stream(f"  {icon} Status set to: {new_status}", "#4ec9b0")
 
@@ -872,10 +1831,19 @@ class MessageWindow(QMainWindow):
 
     def _send_status_change(self, new_status: str):
         """Send status change to relay server."""
-        if hasattr(self, '_status_change_pending'):
-            self._status_change_pending = new_status
-        else:
-            self._status_change_pending = new_status
+        if self._relay_loop:
+            asyncio.run_coroutine_threadsafe(
+                self._send_status_via_relay(new_status), self._relay_loop
+            )
+
+    async def _send_status_via_relay(self, new_status: str):
+        ws = self.relay_client_ws
+        if not ws:
+            return  # Reconnect sends the current status with auth
+        try:
+            await ws.send(relay_encode({"type": "status_change", "status": new_status}, self._relay_binary))
+        except websockets.ConnectionClosed:
+            pass
 
     def _show_tasks(self):
         """Show Claude task queue status."""
@@ -884,36 +1852,21 @@ class MessageWindow(QMainWindow):
         tasks = {"working": [], "pending": [], "done": []}
 
         # Check Claude inbox for tasks
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}-claude.org"):
-            try:
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message(block)
-                    if not msg:
-                        continue
-
-                    # Check task status from properties
-                    task_status = None
-                    for line in block.split("\n"):
-                        if ":TASK_STATUS:" in line:
-                            task_status = line.split(":TASK_STATUS:")[1].strip()
-                            break
-
-                    if task_status == "working":
-                        tasks["working"].append(msg)
-                    elif task_status == "done":
-                        tasks["done"].append(msg)
-                    elif msg.get("unread"):
-                        tasks["pending"].append(msg)
-            except:
-                pass
+        for inbox in self._inbox_paths(f"{self.username}-claude.org"):
+            for msg in self._inbox_messages(inbox):
+                if msg.task_status == "working":
+                    tasks["working"].append(msg)
+                elif msg.task_status == "done":
+                    tasks["done"].append(msg)
+                elif msg.unread:
+                    tasks["pending"].append(msg)
 
         # Display working tasks
         if tasks["working"]:
             for msg in tasks["working"]:
-                text = msg["text"][:50] + "..." if len(msg["text"]) > 50 else msg["text"]
+                text = msg.text[:50] + "..." if len(msg.text) > 50 else msg.text
                 self._add_text_to_stream(f"  🔄 {text}", "#dcdcaa")
-                self._add_text_to_stream(f"     from @{msg['from']} ({msg.get('time', '?')})", "#666")
+                self._add_text_to_stream(f"     from @{msg.sender} ({msg.time})", "#666")
         else:
             self._add_text_to_stream("  No tasks in progress", "#666")
 
@@ -921,7 +1874,7 @@ class MessageWindow(QMainWindow):
         if tasks["pending"]:
             self._add_text_to_stream(f"  📋 {len(tasks['pending'])} pending:", "#4ec9b0")
             for msg in tasks["pending"][:3]:
-                text = msg["text"][:40] + "..." if len(msg["text"]) > 40 else msg["text"]
+                text = msg.text[:40] + "..." if len(msg.text) > 40 else msg.text
                 self._add_text_to_stream(f"     • {text}", "#666")
             if len(tasks["pending"]) > 3:
                 self._add_text_to_stream(f"     ... and {len(tasks['pending']) - 3} more", "#666")
@@ -938,23 +1891,12 @@ class MessageWindow(QMainWindow):
         target_msg = None
         thread_id = None
 
-        for inbox in DATACORE_ROOT.glob("*/org/inboxes/*.org"):
-            try:
-                content = inbox.read_text()
-                if msg_id_fragment not in content:
-                    continue
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    if msg_id_fragment in block:
-                        target_msg = self._parse_message(block)
-                        if target_msg:
-                            thread_id = target_msg.get("thread")
-                            if not thread_id:
-                                # No thread - just show this message
-                                thread_id = f"thread-{target_msg['id']}"
-                        break
-            except:
-                pass
+        inboxes = self._inbox_paths()
+        for inbox in inboxes:
+            target_msg = next((msg for msg in self._inbox_messages(inbox) if msg_id_fragment in msg.id), None)
             if target_msg:
+                # No thread - just show this message
+                thread_id = target_msg.thread or f"thread-{target_msg.id}"
                 break
 
         if not target_msg:
@@ -964,50 +1906,44 @@ class MessageWindow(QMainWindow):
 
         # Find all messages in this thread
         thread_messages = []
-        for inbox in DATACORE_ROOT.glob("*/org/inboxes/*.org"):
-            try:
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message(block)
-                    if msg:
-                        # Include if in same thread or is the target
-                        if msg.get("thread") == thread_id or msg["id"] == target_msg["id"]:
-                            thread_messages.append(msg)
-                        # Also include parent messages
-                        elif msg["id"] == target_msg.get("reply_to"):
-                            thread_messages.append(msg)
-            except:
-                pass
+        for inbox in inboxes:
+            for msg in self._inbox_messages(inbox):
+                # Include if in same thread or is the target
+                if msg.thread == thread_id or msg.id == target_msg.id:
+                    thread_messages.append(msg)
+                # Also include parent messages
+                elif msg.id == target_msg.reply_to:
+                    thread_messages.append(msg)
 
         # Sort by message ID (chronological)
-        thread_messages = sorted(thread_messages, key=lambda m: m.get("id", ""))
+        thread_messages = sorted(thread_messages, key=by_id)
 
         # Remove duplicates
         seen = set()
         unique_msgs = []
         for msg in thread_messages:
-            if msg["id"] not in seen:
-                seen.add(msg["id"])
+            if msg.id not in seen:
+                seen.add(msg.id)
                 unique_msgs.append(msg)
 
         self._add_text_to_stream(f"─── Thread ({len(unique_msgs)} messages) ───", "#c586c0", bold=True)
 
         for msg in unique_msgs:
-            is_target = msg["id"] == target_msg["id"] or msg_id_fragment in msg["id"]
+            is_target = msg.id == target_msg.id or msg_id_fragment in msg.id
             prefix = "► " if is_target else "  "
             color = "#dcdcaa" if is_target else "#569cd6"
 
             # Show reply indicator
             reply_info = ""
-            if msg.get("reply_to"):
+            if msg.reply_to:
                 reply_info = " ↩"
 
             self._add_text_to_stream(
-                f"{prefix}@{msg['from']} ({msg.get('time', '?')}){reply_info}",
+                f"{prefix}@{msg.sender} ({msg.time}){reply_info}",
                 color
             )
             # Truncate long messages
-            text = msg["text"][:100] + "..." if len(msg["text"]) > 100 else msg["text"]
+            text = msg.text[:100] + "..." if len(msg.text) > 100 else msg.text
             self._add_text_to_stream(f"    {text}", "#d4d4d4")
 
         self.input_field.clear()
@@ -1035,103 +1971,59 @@ class MessageWindow(QMainWindow):
         todo_msgs = []
         done_count = 0
 
-        # Check all inboxes for this user
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}.org"):
-            try:
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message(block)
-                    if msg:
-                        msg["inbox"] = str(inbox)
-                        if msg.get("todo"):
-                            todo_msgs.append(msg)
-                        elif msg.get("done"):
-                            done_count += 1
-            except:
-                pass
-
-        # Also check claude inbox
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}-claude.org"):
-            try:
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message(block)
-                    if msg:
-                        msg["inbox"] = str(inbox)
-                        msg["to_claude"] = True
-                        if msg.get("todo"):
-                            todo_msgs.append(msg)
-                        elif msg.get("done"):
-                            done_count += 1
-            except:
-                pass
+        # Check all inboxes for this user, then the claude inbox
+        inboxes = [(inbox, False) for inbox in self._inbox_paths(f"{self.username}.org")]
+        inboxes += [(inbox, True) for inbox in self._inbox_paths(f"{self.username}-claude.org")]
+        if self._parse_in_background([inbox for inbox, _ in inboxes], self._show_todo_messages):
+            return
+        for inbox, to_claude in inboxes:
+            for msg in self._inbox_messages(inbox):
+                if msg.todo:
+                    todo_msgs.append(replace(msg, inbox=str(inbox), to_claude=to_claude))
+                elif msg.done:
+                    done_count += 1
 
-        # Add header to stream
         header_text = f"─── {len(todo_msgs)} todo"
         if done_count:
             header_text += f" ({done_count} done)"
         header_text += " ───"
-        self._add_text_to_stream(header_text, "#dcdcaa", bold=True)
-
         if todo_msgs:
-            for msg in sorted(todo_msgs, key=lambda m: m.get("id", "")):
-                row = MessageRow(msg)
-                row.status_clicked.connect(self._on_status_change)
-                row.delete_clicked.connect(self._on_delete_message)
-                self._add_widget_to_stream(row)
+            self._show_message_list(header_text, "#dcdcaa", sorted(todo_msgs, key=by_id))
         else:
+            self._add_text_to_stream(header_text, "#dcdcaa", bold=True)
             self._add_text_to_stream("  No TODO messages", "#4ec9b0")
 
-        self.input_field.clear()
-
     def _mark_message_by_id(self, msg_id: str, action: str):
         """Mark a message by ID with :todo:, :done:, or clear tags."""
-        import re
-
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}*.org"):
+        for inbox in self._inboxes_for(msg_id):
             try:
                 content = inbox.read_text()
-                if msg_id not in content:
-                    continue
-
-                # Find the MESSAGE block containing this ID and update its tags
-                # Pattern: * MESSAGE [timestamp] :tags:\n:PROPERTIES:\n:ID: msg_id
-                lines = content.split('\n')
-                new_lines = []
-                found = False
-                i = 0
-
-                while i < len(lines):
-                    line = lines[i]
-
-                    # Check if this is a MESSAGE header and the ID matches in upcoming lines
-                    if line.startswith('* MESSAGE ['):
-                        # Look ahead for the ID in the PROPERTIES block
-                        block_end = min(i + 10, len(lines))
-                        block_has_id = any(msg_id in lines[j] for j in range(i, block_end))
-
-                        if block_has_id:
-                            # Remove existing status tags and add new one
-                            header = re.sub(r' :(unread|todo|done):', '', line)
-                            if action == "todo":
-                                header = header.rstrip() + " :todo:"
-                            elif action == "done":
-                                header = header.rstrip() + " :done:"
-                            # else: clear - no tag added
-                            new_lines.append(header)
-                            found = True
-                            i += 1
-                            continue
-
-                    new_lines.append(line)
-                    i += 1
-
-                if found:
-                    inbox.write_text('\n'.join(new_lines))
-                    return True
+            except (OSError, ValueError):
+                continue
+
+            # Splice the new tag into the block's MESSAGE header
+            found = find_message_header(content, msg_id)
+            if not found:
+                continue
+            header_start = found[0]
+            header_end = content.find("\n", header_start)
+            if header_end < 0:
+                header_end = len(content)
+
+            # Remove existing status tags and add new one
+            header = STATUS_TAG_RE.sub("", content[header_start:header_end])
+            if action == "todo":
+                header = header.rstrip() + " :todo:"
+            elif action == "done":
+                header = header.rstrip() + " :done:"
+            # else: clear - no tag added
 
-            except Exception as e:
-                pass
+            try:
+                inbox.write_text(content[:header_start] + header + content[header_end:])
+            except OSError:
+                continue
+            self._parsed_cache.pop(inbox, None)
+            return True
         return False
 
     def _send_message(self):
@@ -1139,225 +2031,335 @@ class MessageWindow(QMainWindow):
         if not text:
             return
 
+        # Anything but /mine or /todos shows its output in the stream
+        self._show_stream()
+
         # Handle /commands
         if text.startswith("/"):
-            if self._handle_command(text):
-                return
-            # Unknown command, show help
-            self._show_help()
+            # Commands add several lines: lay the stream out and paint it once
+            self.stream_widget.setUpdatesEnabled(False)
+            try:
+                if not self._handle_command(text):
+                    self._show_help()  # Unknown command, show help
+            finally:
+                self.stream_widget.setUpdatesEnabled(True)
             return
 
-        if not text.startswith("@"):
+        match = SEND_RE.fullmatch(text)
+        if not match:
             return
 
-        parts = text.split(" ", 1)
-        recipient = parts[0][1:]
-        msg_text = parts[1] if len(parts) > 1 else ""
-
-        if not recipient or not msg_text:
+        # @user >msg-id text replies, @user [route] text routes
+        recipient, reply_to, route_dest, msg_text = match.groups()
+        msg_text = msg_text.strip()
+        if not msg_text:
             return
 
         # Resolve @claude locally
         if recipient == "claude":
             recipient = f"{self.username}-claude"
 
-        # Check for reply syntax: @user >msg-id text
-        reply_to = None
         thread_id = None
-        if msg_text.startswith(">"):
-            reply_parts = msg_text.split(" ", 1)
-            if len(reply_parts) >= 2:
-                reply_to = reply_parts[0][1:]  # Remove >
-                msg_text = reply_parts[1]
-                # Find thread ID from parent message
-                thread_id = self._get_thread_for_message(reply_to)
-                if not thread_id:
-                    # Start new thread from parent message
-                    thread_id = f"thread-{reply_to}"
-
-        # Check for routing syntax: @user [route] text
-        route_dest = None
-        if msg_text.startswith("[") and "]" in msg_text:
-            bracket_end = msg_text.find("]")
-            route_dest = msg_text[1:bracket_end]
-            msg_text = msg_text[bracket_end + 1:].strip()
+        if reply_to is not None:
+            # Find thread ID from parent message
+            thread_id = self._get_thread_for_message(reply_to)
+            if not thread_id:
+                # Start new thread from parent message
+                thread_id = f"thread-{reply_to}"
 
         msg_id = self._write_to_inbox(recipient, msg_text, reply_to=reply_to, thread_id=thread_id, route=route_dest)
 
         if msg_id:
-            # Send via relay
-            if self.relay_connected:
-                def send():
-                    asyncio.run(self._send_via_relay(recipient, msg_text, msg_id, thread_id, reply_to))
-                threading.Thread(target=send, daemon=True).start()
+            # Send via relay (runs on the relay thread's loop)
+            if self.relay_connected and self._relay_loop:
+                asyncio.run_coroutine_threadsafe(
+                    self._send_via_relay(recipient, msg_text, msg_id, thread_id, reply_to),
+                    self._relay_loop,
+                )
 
             display_text = f"↩ {msg_text}" if reply_to else msg_text
-            self.add_message(f"you→{recipient}", display_text, datetime.now().strftime("%H:%M"))
+            self.add_message(f"you→{recipient}", display_text, hhmm_now())
             self.input_field.clear()
 
     async def _send_via_relay(self, to: str, text: str, msg_id: str, thread_id: str = None, reply_to: str = None):
-        if not HAS_WEBSOCKETS:
+        """Send on the listener's authenticated socket; the inbox file is the fallback."""
+        ws = self.relay_client_ws
+        if not ws:
             return
+        msg = {
+            "type": "send",
+            "to": to,
+            "text": text,
+            "msg_id": msg_id
+        }
+        if thread_id:
+            msg["thread"] = thread_id
+        if reply_to:
+            msg["reply_to"] = reply_to
         try:
-            async with websockets.connect(get_relay_url()) as ws:
-                await ws.send(json.dumps({
-                    "type": "auth",
-                    "secret": get_relay_secret(),
-                    "username": self.username,
-                    "claude_whitelist": get_claude_whitelist()
-                }))
-                await ws.recv()
-                msg = {
-                    "type": "send",
-                    "to": to,
-                    "text": text,
-                    "msg_id": msg_id
-                }
-                if thread_id:
-                    msg["thread"] = thread_id
-                if reply_to:
-                    msg["reply_to"] = reply_to
-                await ws.send(json.dumps(msg))
-                await ws.recv()
-        except:
+            # The send_ack comes back to the listener, which ignores it
+            await ws.send(relay_encode(msg, self._relay_binary))
+        except websockets.ConnectionClosed:
             pass
 
     def _write_to_inbox(self, to: str, text: str, reply_to: str = None, thread_id: str = None, route: str = None) -> str:
-        try:
-            inbox_dir = DATACORE_ROOT / self.default_space / "org/inboxes"
-            inbox_dir.mkdir(parents=True, exist_ok=True)
-            inbox = inbox_dir / f"{to}.org"
-
-            now = datetime.now()
-            msg_id = f"msg-{now.strftime('%Y%m%d-%H%M%S')}-{self.username}"
-            timestamp = now.strftime("[%Y-%m-%d %a %H:%M]")
-
-            # Build properties
-            props = [
-                f":ID: {msg_id}",
-                f":FROM: {self.username}",
-                f":TO: {to}",
-            ]
-            if thread_id:
-                props.append(f":THREAD: {thread_id}")
-            if reply_to:
-                props.append(f":REPLY_TO: {reply_to}")
-            if route:
-                props.append(f":ROUTE_TO: {route}")
-
-            props_str = "\n".join(props)
-            entry = f"""
+        inbox = DATACORE_ROOT / self.default_space / "org/inboxes" / f"{to}.org"
+
+        now = datetime.now()
+        msg_id = f"msg-{now.strftime('%Y%m%d-%H%M%S')}-{self.username}"
+        timestamp = now.strftime("[%Y-%m-%d %a %H:%M]")
+
+        # Build properties
+        props = [
+            f":ID: {msg_id}",
+            f":FROM: {self.username}",
+            f":TO: {to}",
+        ]
+        if thread_id:
+            props.append(f":THREAD: {thread_id}")
+        if reply_to:
+            props.append(f":REPLY_TO: {reply_to}")
+        if route:
+            props.append(f":ROUTE_TO: {route}")
+
+        props_str = "\n".join(props)
+        entry = f"""
 * MESSAGE {timestamp} :unread:
 :PROPERTIES:
 {props_str}
 :END:
 {text}
 """
-            with open(inbox, "a") as f:
-                f.write(entry)
-
-            self.seen_ids.add(msg_id)
-            return msg_id
-        except:
-            return None
+        # Appended on the writer thread; the GUI never waits on disk
+        self.inbox_writer.write(inbox, entry)
+
+        self.seen_ids.add(msg_id)
+        return msg_id
+
+    def _on_inbox_written(self, inbox: Path, before: Optional[tuple], after: Optional[tuple], entries: list):
+        """Bring the caches up to date after the writer thread appended to an inbox."""
+        if before is None:
+            self._inbox_cache = None  # New inbox file
+        cached = self._parsed_cache.get(inbox)
+        if not cached:
+            return
+        appended = len("".join(entries).encode())
+        if cached[:2] != before or not after or after[1] != before[1] + appended:
+            # Cache was stale, or someone else wrote too: re-parse on next use
+            del self._parsed_cache[inbox]
+            return
+        # Write through so the next command doesn't re-parse the inbox
+        new = [parse_message(entry.split("\n* MESSAGE ", 1)[1]) for entry in entries]
+        self._parsed_cache[inbox] = (*after, cached[2] + new)
 
     def _get_thread_for_message(self, msg_id: str) -> str:
         """Find thread ID for a message, or None if not in a thread."""
-        for inbox in DATACORE_ROOT.glob("*/org/inboxes/*.org"):
-            try:
-                content = inbox.read_text()
-                if msg_id not in content:
-                    continue
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    if msg_id in block:
-                        # Parse properties
-                        for line in block.split("\n"):
-                            if ":THREAD:" in line:
-                                return line.split(":THREAD:")[1].strip()
-                        return None
-            except:
-                pass
+        for inbox in self._inbox_paths():
+            for msg in self._inbox_messages(inbox):
+                if msg_id in msg.id:
+                    return msg.thread
         return None
 
     def _load_existing_messages(self):
         messages = []
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}.org"):
-            try:
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message(block)
-                    if msg:
-                        self.seen_ids.add(msg["id"])
-                        messages.append(msg)
-            except:
-                pass
+        for inbox in self._inbox_paths(f"{self.username}.org"):
+            # Only the newest messages are shown, so skip the bulk of old inboxes
+            read = self._read_inbox(inbox, window=INBOX_LOAD_WINDOW)
+            if not read:
+                continue
+            for block in message_blocks(read[1].decode("utf-8", errors="replace")):
+                msg = parse_message(block)
+                if msg:
+                    self.seen_ids.add(msg.id)
+                    messages.append(msg)
+
+        self.add_messages([
+            MessageDTO(msg.sender, msg.text, msg.time, msg.unread)
+            for msg in sorted(messages, key=by_id)[-15:]
+        ])
+
+    def _start_watcher(self):
+        """Watch inbox files for changes (inotify/kqueue/FSEvents) instead of polling."""
+        fs_type = get_fs_type(DATACORE_ROOT)
+        if fs_type in NETWORK_FS_TYPES:
+            # inotify never sees writes made by other NFS/SMB clients
+            self._start_polling(f"{fs_type} mount")
+            return
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_inbox_file_changed)
+        self.watcher.directoryChanged.connect(self._on_inbox_dir_changed)
+        self._watch_inboxes()
 
-        for msg in sorted(messages, key=lambda m: m.get("id", ""))[-15:]:
-            self.add_message(msg["from"], msg["text"], msg.get("time", ""), msg.get("unread", False))
+    def _start_polling(self, reason: str):
+        """Fall back to rescanning every inbox on a timer."""
+        if self.poll_timer:
+            return
+        print(f"Inbox watcher: {reason}, polling every {POLL_INTERVAL} ms")
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self._check_inbox)
+        self.poll_timer.start(POLL_INTERVAL)
+
+    def _watch_inboxes(self):
+        """Arm watches on the root and inbox dirs (new spaces/files) and this user's inboxes."""
+        paths = [str(DATACORE_ROOT)]
+        paths += [str(p) for p in DATACORE_ROOT.glob("*/org/inboxes")]
+        paths += [str(p) for p in self._inbox_paths(f"{self.username}.org")]
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        new_paths = [p for p in paths if p not in watched]
+        if new_paths and self.watcher.addPaths(new_paths):
+            # Typically the inotify watch limit (fs.inotify.max_user_watches)
+            self._start_polling("some inboxes can't be watched")
+
+    def _on_inbox_file_changed(self, path: str):
+        """Re-read only the inbox file that changed."""
+        if path not in self.watcher.files() and os.path.exists(path):
+            # Replaced on save: the old watch is gone, re-arm it
+            self.watcher.addPath(path)
+        self._check_inbox_file(Path(path))
+
+    def _on_inbox_dir_changed(self, path: str):
+        """Pick up this user's inbox if it appeared; ignore other files."""
+        self._inbox_cache = None  # Spaces or inbox files came or went
+        if path == str(DATACORE_ROOT):
+            # A space was added or removed: watch any new inbox dirs
+            self._watch_inboxes()
+            return
+        inbox = Path(path) / f"{self.username}.org"
+        if str(inbox) not in self.watcher.files() and inbox.exists():
+            self.watcher.addPath(str(inbox))
+            self._check_inbox_file(inbox)
 
-    def _parse_message(self, block: str) -> dict:
+    def _check_inbox(self):
+        for inbox in self._inbox_paths(f"{self.username}.org"):
+            self._check_inbox_file(inbox)
+
+    def _inbox_messages(self, inbox: Path) -> list[ParsedMsg]:
+        """All parsed messages in one inbox, re-parsed only when the file changes.
+
+        Callers must copy a message before modifying it.
+        """
         try:
-            lines = block.split("\n")
-            header = lines[0]
-            is_unread = ":unread:" in header
-            is_todo = ":todo:" in header
-            is_done = ":done:" in header
-
-            time_str = ""
-            if "[" in header and "]" in header:
-                ts = header[header.find("[")+1:header.find("]")]
-                parts = ts.split(" ")
-                if len(parts) >= 4:
-                    time_str = parts[3]
-
-            props = {}
-            text_lines = []
-            in_props = False
-
-            for line in lines[1:]:
-                if ":PROPERTIES:" in line:
-                    in_props = True
-                elif ":END:" in line:
-                    in_props = False
-                elif in_props and ": " in line:
-                    line = line.strip()
-                    if line.startswith(":"):
-                        kv = line[1:].split(": ", 1)
-                        if len(kv) == 2:
-                            props[kv[0].lower()] = kv[1]
-                elif not in_props and line.strip():
-                    text_lines.append(line)
-
-            return {
-                "id": props.get("id", ""),
-                "from": props.get("from", "?"),
-                "text": "\n".join(text_lines).strip(),
-                "time": time_str,
-                "unread": is_unread,
-                "todo": is_todo,
-                "done": is_done,
-                "thread": props.get("thread"),
-                "reply_to": props.get("reply_to")
-            }
-        except:
+            st = inbox.stat()
+            cached = self._parsed_cache.get(inbox)
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                return cached[2]
+            content = inbox.read_text()
+        except (OSError, ValueError):
+            self._parsed_cache.pop(inbox, None)
+            return []
+        messages = [msg for msg in map(parse_message, message_blocks(content)) if msg]
+        self._store_parsed(inbox, st.st_mtime_ns, st.st_size, messages)
+        return messages
+
+    def _store_parsed(self, inbox: Path, mtime_ns: int, size: int, messages: list):
+        self._parsed_cache[inbox] = (mtime_ns, size, messages)
+        self._msg_inboxes.update((msg.id, inbox) for msg in messages if msg.id)
+
+    def _parse_in_background(self, inboxes: list, then) -> bool:
+        """Parse inboxes missing from the parse cache on the thread pool, then call `then`.
+
+        Returns False, doing nothing, when every inbox is already cached.
+        Only one parse runs at a time: a request made meanwhile replaces
+        the pending `then`, which re-checks for stale inboxes when it runs.
+        """
+        stale = []
+        for inbox in inboxes:
+            try:
+                st = inbox.stat()
+            except OSError:
+                continue
+            cached = self._parsed_cache.get(inbox)
+            if not cached or cached[:2] != (st.st_mtime_ns, st.st_size):
+                stale.append(inbox)
+        if not stale:
+            return False
+        self._after_parse = then
+        if self._parsing:
+            return True
+        self._parsing = True
+        self._flash_status("Loading…", "#666")
+        QThreadPool.globalInstance().start(InboxParseTask(stale, self.bridge))
+        return True
+
+    def _on_inboxes_parsed(self, results: list):
+        self._parsing = False
+        for inbox, mtime_ns, size, messages in results:
+            self._store_parsed(inbox, mtime_ns, size, messages)
+        then, self._after_parse = self._after_parse, None
+        if then:
+            then()
+
+    def _inboxes_for(self, msg_id: str) -> list[Path]:
+        """This user's inboxes, the one msg_id was last seen in first."""
+        inboxes = self._inbox_paths(f"{self.username}*.org")
+        known = self._msg_inboxes.get(msg_id)
+        if known in inboxes:
+            inboxes.remove(known)
+            inboxes.insert(0, known)
+        return inboxes
+
+    def _inbox_paths(self, pattern: str = "*.org") -> list[Path]:
+        """Inbox files in every space whose name matches `pattern`."""
+        now = time.monotonic()
+        if self._inbox_cache is None or now - self._inbox_cache[0] > INBOX_PATHS_TTL:
+            self._inbox_cache = (now, scan_inboxes())
+        return [p for p in self._inbox_cache[1] if fnmatchcase(p.name, pattern)]
+
+    def _read_inbox(self, inbox: Path, window: int = 0) -> Optional[tuple[int, bytes]]:
+        """Read an inbox from where the last read left off; None if unchanged.
+
+        Returns (offset, data). An append is re-read from the last MESSAGE
+        heading seen, so a block caught half-written is parsed again. Any
+        other change (tags rewritten, a message deleted) reads the whole
+        file, or its last `window` bytes if given.
+        """
+        try:
+            st = inbox.stat()
+            state = self._inbox_state.get(inbox)
+            if state and state[:2] == (st.st_mtime_ns, st.st_size):
+                return None
+            with inbox.open("rb") as f:
+                data = None
+                if state and state[2] >= 0 and st.st_size >= state[1]:
+                    offset = state[2]
+                    f.seek(offset)
+                    data = f.read()
+                    if not data.startswith(MESSAGE_MARKER):
+                        data = None  # Rewritten in place, not appended to
+                if data is None:
+                    offset = max(0, st.st_size - window) if window else 0
+                    f.seek(offset)
+                    data = f.read()
+        except OSError:
+            self._inbox_state.pop(inbox, None)
             return None
 
-    def _start_watcher(self):
-        self.watcher = QTimer(self)
-        self.watcher.timeout.connect(self._check_inbox)
-        self.watcher.start(POLL_INTERVAL)
+        last = data.rfind(MESSAGE_MARKER)
+        self._inbox_state[inbox] = (st.st_mtime_ns, st.st_size, offset + last if last >= 0 else -1)
+        return offset, data
 
-    def _check_inbox(self):
-        try:
-            for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}.org"):
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message(block)
-                    if msg and msg["id"] and msg["id"] not in self.seen_ids:
-                        self.seen_ids.add(msg["id"])
-                        self.add_message(msg["from"], msg["text"], msg.get("time", "now"), True)
-        except:
-            pass
+    def _check_inbox_file(self, inbox: Path):
+        """Show messages from one inbox file that haven't been seen yet."""
+        read = self._read_inbox(inbox)
+        if not read:
+            return
+        offset, data = read
+        blocks = message_blocks(data.decode("utf-8", errors="replace"))
+        messages = [msg for msg in map(parse_message, blocks) if msg and msg.id]
+        if offset == 0:
+            # Full re-read: messages are appended, so only those after the
+            # newest one already seen are new (older ones may never have been loaded)
+            for i in range(len(messages) - 1, -1, -1):
+                if messages[i].id in self.seen_ids:
+                    messages = messages[i + 1:]
+                    break
+        new = []
+        for msg in messages:
+            if msg.id not in self.seen_ids:
+                self.seen_ids.add(msg.id)
+                new.append(MessageDTO(msg.sender, msg.text, msg.time, True))
+        self.add_messages(new)
 
     def _start_relay_thread(self):
         if not is_relay_enabled():
@@ -1372,6 +2374,15 @@ class MessageWindow(QMainWindow):
         thread.start()
 
     def _relay_thread(self):
+        """Run one long-lived event loop for the embedded relay and client.
+
+        Qt owns the main thread, so uvloop only ever drives this loop;
+        the GUI talks to it through run_coroutine_threadsafe.
+        """
+        loop = fastloop.new_event_loop() if HAS_FASTLOOP else asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._relay_loop = loop
+
         async def run():
             # Start embedded relay if hosting
             if self.host_relay and HAS_AIOHTTP:
@@ -1382,26 +2393,62 @@ class MessageWindow(QMainWindow):
             # Connect as client
             await self._connect_relay()
 
-        asyncio.run(run())
+        # Keep the loop alive after run() returns so a hosted relay keeps serving
+        loop.create_task(run())
+        loop.run_forever()
+
+    def shutdown(self, timeout: float = 2):
+        """Flush pending inbox writes and close relay sockets before exit."""
+        self.inbox_writer.stop()  # Don't lose a just-sent message on quit
+        loop = self._relay_loop
+        if not loop or not loop.is_running():
+            return
+
+        async def close():
+            if self.relay_client_ws:
+                await self.relay_client_ws.close()
+            if self.relay:
+                await self.relay.stop()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close(), loop).result(timeout)
+        except Exception:
+            pass  # Exiting anyway; peers see the socket drop
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _queue_relay_message(self, msg: MessageDTO):
+        """Coalesce relay messages arriving within RELAY_BATCH_DELAY into one emit."""
+        if not self._relay_batch:
+            asyncio.get_running_loop().call_later(RELAY_BATCH_DELAY, self._flush_relay_batch)
+        self._relay_batch.append(msg)
+
+    def _flush_relay_batch(self):
+        batch, self._relay_batch = self._relay_batch, []
+        self.bridge.messages_received.emit(batch)
 
     async def _connect_relay(self):
         url = get_relay_url()
-        secret = get_relay_secret()
+        # Built once; only the status can differ between reconnects
+        auth = {
+            "type": "auth",
+            "secret": get_relay_secret(),
+            "username": self.username,
+            "claude_whitelist": get_claude_whitelist()
+        }
+
+        # Offer msgpack; relays that don't know it leave both sides on JSON text
+        subprotocols = [RELAY_MSGPACK_PROTOCOL] if HAS_MSGPACK else None
 
         while True:
             try:
-                async with websockets.connect(url) as ws:
+                async with websockets.connect(url, subprotocols=subprotocols) as ws:
+                    self._relay_binary = ws.subprotocol == RELAY_MSGPACK_PROTOCOL
                     self.relay_client_ws = ws
-                    await ws.send(json.dumps({
-                        "type": "auth",
-                        "secret": secret,
-                        "username": self.username,
-                        "status": self.my_status,
-                        "claude_whitelist": get_claude_whitelist()
-                    }))
-
-                    resp = json.loads(await ws.recv())
-                    if resp.get("type") == "auth_ok":
+                    auth["status"] = self.my_status
+                    await ws.send(relay_encode(auth, self._relay_binary))
+
+                    resp = relay_decode(await ws.recv())
+                    if isinstance(resp, dict) and resp.get("type") == "auth_ok":
                         self.relay_connected = True
                         mode = "● hosting" if self.host_relay else "● relay"
                         self.bridge.status_changed.emit(mode)
@@ -1411,22 +2458,19 @@ class MessageWindow(QMainWindow):
                         )
 
                         async for message in ws:
-                            # Check for pending status change
-                            if hasattr(self, '_status_change_pending') and self._status_change_pending:
-                                await ws.send(json.dumps({
-                                    "type": "status_change",
-                                    "status": self._status_change_pending
-                                }))
-                                self._status_change_pending = None
-
-                            data = json.loads(message)
+                            try:
+                                data = relay_decode(message)
+                            except ValueError:
+                                continue
+                            if not isinstance(data, dict):
+                                continue
                             if data.get("type") == "message":
-                                self.bridge.message_received.emit(
+                                self._queue_relay_message(MessageDTO(
                                     data.get("from", "?"),
                                     data.get("text", ""),
-                                    datetime.now().strftime("%H:%M"),
+                                    hhmm_now(),
                                     True, "normal", True
-                                )
+                                ))
                             elif data.get("type") == "presence_change":
                                 self.bridge.presence_changed.emit(
                                     data.get("online", []),
@@ -1438,11 +2482,17 @@ class MessageWindow(QMainWindow):
                         self.bridge.status_changed.emit("auth failed")
                         break
 
+            except (OSError, websockets.WebSocketException, ValueError):
+                pass
             except Exception as e:
-                self.relay_connected = False
-                self.relay_client_ws = None
-                self.bridge.status_changed.emit(f"reconnecting...")
-                await asyncio.sleep(5)
+                # A bug in frame handling mustn't leave the window offline for good
+                print(f"Relay client error: {e!r}")
+
+            # Dropped, closed by the relay, or failed: retry after a pause
+            self.relay_connected = False
+            self.relay_client_ws = None
+            self.bridge.status_changed.emit("reconnecting...")
+            await asyncio.sleep(5)
 
 
 def main():
@@ -1461,7 +2511,9 @@ def main():
     mode = "hosting relay" if host_relay else "connecting"
     print(f"Datacore Messages - @{window.username} ({mode})")
 
-    sys.exit(app.exec())
+    status = app.exec()
+    window.shutdown()
+    sys.exit(status)
 
 
 if __name__ == "__main__":
@@ -44,7 +44,7 @@ def get_username():
             name = conf.get("identity", {}).get("name")
             if name:
                 return name
-        except:
+        except Exception:  # PyYAML missing or settings unreadable
             pass
 
     # Fallback to system user
@@ -175,7 +175,7 @@ def get_working_task_count(inbox_path):
     try:
         content = inbox_path.read_text()
         return content.count(":TASK_STATUS: working")
-    except:
+    except (OSError, ValueError):
         return 0
 
 
@@ -188,7 +188,7 @@ def main():
 
     try:
         content = inbox.read_text()
-    except:
+    except (OSError, ValueError):
         sys.exit(0)
 
     messages = parse_messages(content)
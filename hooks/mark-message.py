@@ -31,11 +31,31 @@ def get_username():
             name = conf.get("identity", {}).get("name")
             if name:
                 return name
-        except:
+        except Exception:  # PyYAML missing or settings unreadable
             pass
     return os.environ.get("USER", "unknown")
 
 
+STATUS_TAG_RE = re.compile(r" *:(?:unread|todo|done):")
+
+
+def find_message_header(content: str, msg_id_part: str):
+    """(start, end) of the MESSAGE header line of the block whose :ID: contains msg_id_part."""
+    pos = content.find(msg_id_part)
+    while pos >= 0:
+        line_start = content.rfind("\n", 0, pos) + 1
+        if content.startswith(":ID:", line_start):
+            break
+        pos = content.find(msg_id_part, pos + 1)
+    if pos < 0:
+        return None
+    header_start = content.rfind("\n* MESSAGE [", 0, line_start) + 1
+    if not header_start and not content.startswith("* MESSAGE ["):
+        return None
+    header_end = content.find("\n", header_start)
+    return header_start, header_end if header_end >= 0 else len(content)
+
+
 def mark_message(msg_id_part: str, action: str) -> bool:
     """Mark a message with the given status."""
     username = get_username()
@@ -43,26 +63,19 @@ def mark_message(msg_id_part: str, action: str) -> bool:
     for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{username}*.org"):
         try:
             content = inbox.read_text()
-            if msg_id_part in content:
-                pattern = rf'(\* MESSAGE \[[^\]]+\])([^\n]*)(.*?:ID: [^\n]*{re.escape(msg_id_part)}[^\n]*)'
-
-                def replace_tags(match):
-                    header = match.group(1)
-                    tags = match.group(2)
-                    rest = match.group(3)
-                    tags = re.sub(r':(?:unread|todo|done):', '', tags).strip()
-
-                    if action == "todo":
-                        return f"{header} :todo:{rest}"
-                    elif action == "done":
-                        return f"{header} :done:{rest}"
-                    else:  # read/clear
-                        return f"{header}{rest}"
-
-                new_content, count = re.subn(pattern, replace_tags, content, flags=re.DOTALL)
-                if count > 0:
-                    inbox.write_text(new_content)
-                    return True
+            found = find_message_header(content, msg_id_part)
+            if not found:
+                continue
+            start, end = found
+            header = STATUS_TAG_RE.sub("", content[start:end]).rstrip()
+            if action == "todo":
+                header += " :todo:"
+            elif action == "done":
+                header += " :done:"
+            # else: read/clear - no tag
+
+            inbox.write_text(content[:start] + header + content[end:])
+            return True
         except Exception as e:
             print(f"Error processing {inbox}: {e}", file=sys.stderr)
 
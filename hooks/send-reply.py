@@ -46,7 +46,7 @@ def get_settings():
         try:
             import yaml
             return yaml.safe_load(module_settings.read_text()) or {}
-        except:
+        except Exception:  # PyYAML missing or settings unreadable
             pass
     return {}
 
@@ -83,7 +83,7 @@ def get_thread_for_message(msg_id):
                         if ":THREAD:" in line:
                             return line.split(":THREAD:")[1].strip()
                     return None
-        except:
+        except (OSError, ValueError):
             pass
     return None
 
@@ -32,7 +32,7 @@ def get_username():
             name = conf.get("identity", {}).get("name")
             if name:
                 return name
-        except:
+        except Exception:  # PyYAML missing or settings unreadable
             pass
     return os.environ.get("USER", "unknown")
 
@@ -42,7 +42,7 @@ def get_state():
     if STATE_FILE.exists():
         try:
             return json.loads(STATE_FILE.read_text())
-        except:
+        except (OSError, ValueError):
             pass
     return {"current_task": None, "completed": []}
 
@@ -95,7 +95,7 @@ def get_pending_tasks():
                         "priority": props.get("priority", "normal"),
                         "inbox": str(inbox)
                     })
-        except:
+        except (OSError, ValueError):
             pass
 
     # Sort: high priority first, then by ID (chronological)
@@ -119,7 +119,7 @@ def get_working_tasks():
                             msg_id = line.split(":ID:")[1].strip()
                             tasks.append(msg_id)
                             break
-        except:
+        except (OSError, ValueError):
             pass
 
     return tasks
@@ -17,16 +17,19 @@ Requirements:
 import sys
 import os
 import json
+import re
 import threading
 import asyncio
 from pathlib import Path
+from collections import OrderedDict
 from datetime import datetime
+from typing import Optional
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTextEdit, QLineEdit, QLabel, QFrame, QScrollArea
+    QPlainTextEdit, QLineEdit, QLabel, QFrame, QScrollArea
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QFileSystemWatcher
 from PyQt6.QtGui import QFont, QColor, QTextCursor, QTextCharFormat
 
 # Optional websockets for relay
@@ -40,7 +43,74 @@ except ImportError:
 
 DATACORE_ROOT = Path(os.environ.get("DATACORE_ROOT", Path.home() / "Data"))
 MODULE_DIR = Path(__file__).parent.parent  # datacore-messaging/
-POLL_INTERVAL = 2000  # milliseconds
+POLL_INTERVAL = 2000  # milliseconds, only when inboxes can't be watched
+CHECK_DEBOUNCE = 50  # milliseconds; a burst of appends is read once
+WRITE_DELAY = 50  # milliseconds; entries sent within this share one append per inbox
+MAX_DISPLAY_LINES = 2000  # oldest lines are dropped past this (~650 messages)
+MESSAGE_MARKER = b"\n* MESSAGE "
+SEEN_IDS_MAX = 50_000  # message ids remembered to skip already-shown messages
+
+
+class BoundedSet:
+    """Set of the most recently added strings; the least recently added drop out past maxlen."""
+    __slots__ = ("maxlen", "_items")
+
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._items: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: str):
+        if item in self._items:
+            self._items.move_to_end(item)
+            return
+        self._items[sys.intern(item)] = None
+        if len(self._items) > self.maxlen:
+            self._items.popitem(last=False)
+
+
+def _char_format(color: str, bold: bool = False) -> QTextCharFormat:
+    fmt = QTextCharFormat()
+    fmt.setForeground(QColor(color))
+    if bold:
+        fmt.setFontWeight(700)
+    return fmt
+
+
+class _Fmt:
+    """Message log text formats, built once rather than per message."""
+    UNREAD_DOT = _char_format("#f48771")
+    SENDER_YOU = _char_format("#4ec9b0", bold=True)
+    SENDER_CLAUDE = _char_format("#c586c0", bold=True)
+    SENDER_RELAY = _char_format("#dcdcaa", bold=True)
+    SENDER_OTHER = _char_format("#569cd6", bold=True)
+    META = _char_format("#666666")
+    PRIORITY = _char_format("#f48771")
+    BODY = _char_format("#d4d4d4")
+
+
+# `:KEY: value` lines of a properties drawer
+ORG_PROPERTY_RE = re.compile(r"^[ \t]*:([A-Za-z_]+):[ \t]*(.*?)[ \t]*$", re.M)
+
+
+def message_blocks(content: str):
+    """Yield the text after each "\\n* MESSAGE " marker, without splitting the whole file."""
+    marker = "\n* MESSAGE "
+    start = content.find(marker)
+    while start >= 0:
+        start += len(marker)
+        end = content.find(marker, start)
+        yield content[start:end if end >= 0 else None]
+        start = end
+
+
+# Flattened settings, reused until a settings file changes on disk
+_FLAT_SETTINGS_CACHE: Optional[tuple] = None  # (settings_stamp(), flat settings)
 
 
 def get_settings() -> dict:
@@ -49,6 +119,7 @@ def get_settings() -> dict:
         import yaml
     except ImportError:
         return {}
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # libyaml when available
 
     settings = {}
 
@@ -56,33 +127,68 @@ def get_settings() -> dict:
     root_settings = DATACORE_ROOT / ".datacore/settings.local.yaml"
     if root_settings.exists():
         try:
-            settings = yaml.safe_load(root_settings.read_text()) or {}
-        except:
+            settings = yaml.load(root_settings.read_bytes(), Loader=loader) or {}
+        except (OSError, ValueError, yaml.YAMLError):
             pass
 
     # Then overlay module-specific settings
     module_settings = MODULE_DIR / "settings.local.yaml"
     if module_settings.exists():
         try:
-            mod = yaml.safe_load(module_settings.read_text()) or {}
+            mod = yaml.load(module_settings.read_bytes(), Loader=loader) or {}
             for key, value in mod.items():
                 if key in settings and isinstance(settings[key], dict) and isinstance(value, dict):
                     settings[key].update(value)
                 else:
                     settings[key] = value
-        except:
+        except (OSError, ValueError, AttributeError, yaml.YAMLError):  # AttributeError: not a mapping
             pass
 
     return settings
 
 
+def flatten_settings(conf: dict, prefix: str = "") -> dict:
+    """Flatten nested settings into dotted keys ("messaging.relay.url") in one pass."""
+    flat = {}
+    for key, value in conf.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_settings(value, path + "."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def settings_stamp() -> tuple:
+    """(mtime_ns, size) of each settings file, None for a missing one."""
+    stamp = []
+    for path in (DATACORE_ROOT / ".datacore/settings.local.yaml", MODULE_DIR / "settings.local.yaml"):
+        try:
+            st = path.stat()
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def get_flat_settings() -> dict:
+    """Load settings and flatten them for single-lookup access.
+
+    Cached until a settings file changes; the dict is shared, so don't modify it.
+    """
+    global _FLAT_SETTINGS_CACHE
+    stamp = settings_stamp()
+    if _FLAT_SETTINGS_CACHE is None or _FLAT_SETTINGS_CACHE[0] != stamp:
+        _FLAT_SETTINGS_CACHE = (stamp, flatten_settings(get_settings()))
+    return _FLAT_SETTINGS_CACHE[1]
+
+
 def get_username() -> str:
     """Get current user's identity from settings or environment."""
     if "DATACORE_USER" in os.environ:
         return os.environ["DATACORE_USER"]
 
-    conf = get_settings()
-    name = conf.get("identity", {}).get("name")
+    name = get_flat_settings().get("identity.name")
     if name:
         return name
 
@@ -91,8 +197,7 @@ def get_username() -> str:
 
 def get_default_space() -> str:
     """Get default space for sending messages."""
-    conf = get_settings()
-    space = conf.get("messaging", {}).get("default_space")
+    space = get_flat_settings().get("messaging.default_space")
     if space:
         return space
 
@@ -105,27 +210,23 @@ def get_default_space() -> str:
 
 def get_relay_url() -> str:
     """Get relay server URL from settings."""
-    conf = get_settings()
-    return conf.get("messaging", {}).get("relay", {}).get("url", "wss://datacore-relay.fly.dev")
+    return get_flat_settings().get("messaging.relay.url", "wss://datacore-relay.fly.dev")
 
 
 def get_relay_secret() -> str:
     """Get relay shared secret from settings."""
-    conf = get_settings()
-    return conf.get("messaging", {}).get("relay", {}).get("secret")
+    return get_flat_settings().get("messaging.relay.secret")
 
 
 def is_relay_enabled() -> bool:
     """Check if relay is enabled in settings."""
-    conf = get_settings()
-    relay_conf = conf.get("messaging", {}).get("relay", {})
-    return relay_conf.get("enabled", False) or bool(relay_conf.get("secret"))
+    flat = get_flat_settings()
+    return flat.get("messaging.relay.enabled", False) or bool(flat.get("messaging.relay.secret"))
 
 
 def get_claude_whitelist() -> list:
     """Get list of users allowed to message this user's Claude."""
-    conf = get_settings()
-    return conf.get("messaging", {}).get("claude_whitelist", [])
+    return get_flat_settings().get("messaging.claude_whitelist", [])
 
 
 class SignalBridge(QObject):
@@ -179,10 +280,14 @@ class RelayClient:
             self.bridge.status_changed.emit(f"Connection failed: {str(e)[:30]}")
             return False
 
-    async def send_message(self, to: str, text: str, msg_id: str, priority: str = "normal") -> bool:
-        """Send message via relay."""
+    async def send_message(self, to: str, text: str, msg_id: str, priority: str = "normal") -> None:
+        """Send message over the open relay connection.
+
+        Must run on the relay loop. Fire-and-forget: the message is already
+        in the inbox, and the send_ack comes back to listen(), which ignores it.
+        """
         if not self.ws:
-            return False
+            return
 
         try:
             await self.ws.send(json.dumps({
@@ -192,11 +297,8 @@ class RelayClient:
                 "msg_id": msg_id,
                 "priority": priority
             }))
-
-            response = json.loads(await self.ws.recv())
-            return response.get("delivered", False)
-        except:
-            return False
+        except (OSError, websockets.WebSocketException, ValueError):
+            pass  # The peer still gets it from the inbox
 
     async def listen(self):
         """Listen for incoming messages."""
@@ -241,9 +343,14 @@ class MessageWindow(QMainWindow):
 
         self.username = get_username()
         self.default_space = get_default_space()
-        self.seen_ids = set()
+        self.seen_ids = BoundedSet(SEEN_IDS_MAX)
+        self._inbox_state: dict[Path, tuple[int, int, int]] = {}  # mtime_ns, size, last MESSAGE offset
+        self._scroll_pending = False
+        self._inboxes: Optional[list[Path]] = None  # This user's inbox files; None = rescan
+        self._pending_writes: dict[Path, list[str]] = {}  # Inbox entries not yet appended
         self.relay_client = None
         self.relay_connected = False
+        self.relay_loop = None  # asyncio loop owned by the relay thread
         self.bridge = SignalBridge()
 
         # Connect signals
@@ -324,8 +431,12 @@ class MessageWindow(QMainWindow):
         layout.addLayout(header)
 
         # Messages area
-        self.messages_area = QTextEdit()
+        # Plain text layout is per-block, and old lines drop off the top,
+        # so a long-running window doesn't re-lay out its whole history
+        self.messages_area = QPlainTextEdit()
         self.messages_area.setReadOnly(True)
+        self.messages_area.setMaximumBlockCount(MAX_DISPLAY_LINES)
+        self.messages_area.setUndoRedoEnabled(False)  # Append-only view
         self.messages_area.setMinimumHeight(200)
         layout.addWidget(self.messages_area, stretch=1)
 
@@ -351,60 +462,64 @@ class MessageWindow(QMainWindow):
         self.move(screen.width() - 370, 40)
 
     def add_message(self, sender: str, text: str, time_str: str,
-                    unread: bool = False, priority: str = "normal", via_relay: bool = False):
+                    unread: bool = False, priority: str = "normal", via_relay: bool = False,
+                    scroll: bool = True):
         """Add a message to the display."""
         cursor = self.messages_area.textCursor()
         cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()  # One relayout for all the inserts below
 
         # Unread marker
         if unread:
-            fmt = QTextCharFormat()
-            fmt.setForeground(QColor("#f48771"))
-            cursor.insertText("● ", fmt)
+            cursor.insertText("● ", _Fmt.UNREAD_DOT)
         else:
             cursor.insertText("  ")
 
         # Sender
-        fmt = QTextCharFormat()
         if sender.startswith("you→"):
-            fmt.setForeground(QColor("#4ec9b0"))
+            fmt = _Fmt.SENDER_YOU
         elif sender == "claude":
-            fmt.setForeground(QColor("#c586c0"))
+            fmt = _Fmt.SENDER_CLAUDE
         elif via_relay:
-            fmt.setForeground(QColor("#dcdcaa"))
+            fmt = _Fmt.SENDER_RELAY
         else:
-            fmt.setForeground(QColor("#569cd6"))
-        fmt.setFontWeight(700)
+            fmt = _Fmt.SENDER_OTHER
         cursor.insertText(f"@{sender} ", fmt)
 
         # Time
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor("#666666"))
         relay_marker = " ↗" if via_relay else ""
-        cursor.insertText(f"{time_str}{relay_marker}\n", fmt)
+        cursor.insertText(f"{time_str}{relay_marker}\n", _Fmt.META)
 
         # Priority
         if priority == "high":
-            fmt = QTextCharFormat()
-            fmt.setForeground(QColor("#f48771"))
-            cursor.insertText("  [!] ", fmt)
+            cursor.insertText("  [!] ", _Fmt.PRIORITY)
         else:
             cursor.insertText("  ")
 
         # Message text
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor("#d4d4d4"))
         display_text = text[:200] + "..." if len(text) > 200 else text
-        cursor.insertText(f"{display_text}\n\n", fmt)
+        cursor.insertText(f"{display_text}\n\n", _Fmt.BODY)
+        cursor.endEditBlock()
 
         # Scroll to bottom
         self.messages_area.setTextCursor(cursor)
-        self.messages_area.ensureCursorVisible()
+        if scroll:
+            self._scroll_to_bottom()
 
         # Notify
         if unread:
             self._notify(sender, text)
 
+    def _scroll_to_bottom(self):
+        """Scroll to the newest message once per burst, not once per message."""
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            QTimer.singleShot(16, self._do_scroll)
+
+    def _do_scroll(self):
+        self._scroll_pending = False
+        self.messages_area.ensureCursorVisible()
+
     def _notify(self, sender: str, text: str):
         """Send notification."""
         self.raise_()
@@ -420,7 +535,7 @@ class MessageWindow(QMainWindow):
                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 subprocess.Popen(["afplay", "/System/Library/Sounds/Ping.aiff"],
                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            except:
+            except OSError:
                 pass
 
     def update_relay_status(self, status: str):
@@ -465,10 +580,10 @@ class MessageWindow(QMainWindow):
 
         if msg_id:
             via_relay = False
-            if self.relay_connected and self.relay_client:
-                def send_relay():
-                    asyncio.run(self.relay_client.send_message(recipient, msg_text, msg_id))
-                threading.Thread(target=send_relay, daemon=True).start()
+            if self.relay_connected and self.relay_client and self.relay_loop:
+                # Reuse the relay thread's connection rather than a thread and loop per send
+                asyncio.run_coroutine_threadsafe(
+                    self.relay_client.send_message(recipient, msg_text, msg_id), self.relay_loop)
                 via_relay = True
 
             self.add_message(
@@ -497,17 +612,14 @@ class MessageWindow(QMainWindow):
         ))
 
     def _write_to_inbox(self, to: str, text: str) -> str:
-        """Write message to recipient's org inbox."""
-        try:
-            inbox_dir = DATACORE_ROOT / self.default_space / "org/inboxes"
-            inbox_dir.mkdir(parents=True, exist_ok=True)
-            inbox = inbox_dir / f"{to}.org"
+        """Queue a message for the recipient's org inbox; _flush_writes appends it."""
+        inbox = DATACORE_ROOT / self.default_space / "org/inboxes" / f"{to}.org"
 
-            now = datetime.now()
-            msg_id = f"msg-{now.strftime('%Y%m%d-%H%M%S')}-{self.username}"
-            timestamp = now.strftime("[%Y-%m-%d %a %H:%M]")
+        now = datetime.now()
+        msg_id = f"msg-{now.strftime('%Y%m%d-%H%M%S')}-{self.username}"
+        timestamp = now.strftime("[%Y-%m-%d %a %H:%M]")
 
-            entry = f"""
+        entry = f"""
 * MESSAGE {timestamp} :unread:
 :PROPERTIES:
 :ID: {msg_id}
@@ -518,32 +630,43 @@ class MessageWindow(QMainWindow):
 {text}
 """
 
-            with open(inbox, "a") as f:
-                f.write(entry)
+        if not self._pending_writes:
+            QTimer.singleShot(WRITE_DELAY, self._flush_writes)
+        self._pending_writes.setdefault(inbox, []).append(entry)
 
-            self.seen_ids.add(msg_id)
-            return msg_id
+        self.seen_ids.add(msg_id)
+        return msg_id
 
-        except Exception as e:
-            print(f"Error writing message: {e}", file=sys.stderr)
-            return None
+    def _flush_writes(self):
+        """Append queued entries with one open/write per inbox."""
+        pending, self._pending_writes = self._pending_writes, {}
+        for inbox, entries in pending.items():
+            try:
+                inbox.parent.mkdir(parents=True, exist_ok=True)
+                with open(inbox, "a") as f:
+                    f.write("".join(entries))
+            except OSError as e:
+                print(f"Error writing message: {e}", file=sys.stderr)
+                self._show_error(f"Couldn't write to {inbox.name}")
 
     def _load_existing_messages(self):
         """Load last N messages from inbox on startup."""
         messages = []
 
-        for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}.org"):
-            try:
-                content = inbox.read_text()
-                for block in content.split("\n* MESSAGE ")[1:]:
-                    msg = self._parse_message_block(block)
-                    if msg:
-                        self.seen_ids.add(msg["id"])
-                        messages.append(msg)
-            except:
-                pass
+        for inbox in self._inbox_paths():
+            # Also records where the watcher picks up reading from
+            data = self._read_inbox(inbox)
+            if data is None:
+                continue
+            for block in message_blocks(data.decode("utf-8", errors="replace")):
+                msg = self._parse_message_block(block)
+                if msg:
+                    self.seen_ids.add(msg["id"])
+                    messages.append(msg)
 
         messages.sort(key=lambda m: m.get("id", ""))
+        batch = self.messages_area.textCursor()
+        batch.beginEditBlock()
         for msg in messages[-15:]:
             self.add_message(
                 msg["from"],
@@ -551,67 +674,132 @@ class MessageWindow(QMainWindow):
                 msg.get("time", "earlier"),
                 unread=msg.get("unread", False),
                 priority=msg.get("priority", "normal"),
+                scroll=False,
             )
+        batch.endEditBlock()
+        self.messages_area.ensureCursorVisible()
 
     def _parse_message_block(self, block: str) -> dict:
         """Parse a MESSAGE block from org file."""
+        header, _, rest = block.partition("\n")
+
+        is_unread = ":unread:" in header
+
+        time_str = "earlier"
+        if "[" in header and "]" in header:
+            ts = header[header.find("[")+1:header.find("]")]
+            parts = ts.split(" ")
+            if len(parts) >= 4:
+                time_str = parts[3]
+
+        # Cut out the :PROPERTIES: drawer and read its lines with one regex pass
+        drawer = ""
+        before, found, after = rest.partition(":PROPERTIES:")
+        if found:
+            drawer, _, after = after.partition(":END:")
+            rest = before.rpartition("\n")[0] + "\n" + after.partition("\n")[2]
+        props = {key.lower(): value for key, value in ORG_PROPERTY_RE.findall(drawer)}
+        text_lines = [line for line in rest.split("\n") if line.strip()]
+
+        return {
+            "id": props.get("id", ""),
+            "from": props.get("from", "?"),
+            "to": props.get("to", ""),
+            "text": "\n".join(text_lines).strip(),
+            "time": time_str,
+            "unread": is_unread,
+            "priority": props.get("priority", "normal"),
+            "source": props.get("source", "local"),
+        }
+
+    def _start_watcher(self):
+        """Watch inbox files for changes instead of polling."""
+        self.watcher_timer = None
+        self.check_timer = QTimer(self)
+        self.check_timer.setSingleShot(True)
+        self.check_timer.setInterval(CHECK_DEBOUNCE)
+        self.check_timer.timeout.connect(self._check_inbox)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_inbox_changed)
+        self.watcher.directoryChanged.connect(self._on_inbox_dir_changed)
+        self._watch_inboxes()
+
+    def _watch_inboxes(self):
+        """Watch the root and inbox dirs (new spaces/files) and this user's inboxes."""
+        paths = [str(DATACORE_ROOT)]
+        paths += [str(p) for p in DATACORE_ROOT.glob("*/org/inboxes")]
+        paths += [str(p) for p in self._inbox_paths()]
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        new_paths = [p for p in paths if p not in watched]
+        if new_paths and self.watcher.addPaths(new_paths) and not self.watcher_timer:
+            # Typically the inotify watch limit: fall back to polling
+            self.watcher_timer = QTimer(self)
+            self.watcher_timer.timeout.connect(self._poll_inboxes)
+            self.watcher_timer.start(POLL_INTERVAL)
+
+    def _on_inbox_changed(self, path: str):
+        if path not in self.watcher.files() and os.path.exists(path):
+            self.watcher.addPath(path)  # Replaced on save: re-arm the watch
+        self.check_timer.start()
+
+    def _on_inbox_dir_changed(self, path: str):
+        self._inboxes = None  # Spaces or inbox files came or went
+        self._watch_inboxes()
+        self.check_timer.start()
+
+    def _poll_inboxes(self):
+        # Without directory events a new space only shows up on a rescan
+        self._inboxes = None
+        self._check_inbox()
+
+    def _inbox_paths(self) -> list[Path]:
+        """This user's inbox in every space, globbed only after a directory change."""
+        if self._inboxes is None:
+            self._inboxes = list(DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}.org"))
+        return self._inboxes
+
+    def _read_inbox(self, inbox: Path) -> Optional[bytes]:
+        """Bytes of an inbox not read yet; None if the file is unchanged.
+
+        An append is re-read from the last MESSAGE heading seen, so a block
+        caught half-written is parsed again. Any other change (tags
+        rewritten, a message deleted) reads the whole file.
+        """
         try:
-            lines = block.split("\n")
-            header = lines[0] if lines else ""
-
-            is_unread = ":unread:" in header
-
-            time_str = "earlier"
-            if "[" in header and "]" in header:
-                ts = header[header.find("[")+1:header.find("]")]
-                parts = ts.split(" ")
-                if len(parts) >= 4:
-                    time_str = parts[3]
-
-            props = {}
-            text_lines = []
-            in_props = False
-
-            for line in lines[1:]:
-                if ":PROPERTIES:" in line:
-                    in_props = True
-                elif ":END:" in line:
-                    in_props = False
-                elif in_props and ": " in line:
-                    line = line.strip()
-                    if line.startswith(":") and ": " in line[1:]:
-                        key_val = line[1:].split(": ", 1)
-                        if len(key_val) == 2:
-                            props[key_val[0].lower()] = key_val[1]
-                elif not in_props and line.strip():
-                    text_lines.append(line)
-
-            return {
-                "id": props.get("id", ""),
-                "from": props.get("from", "?"),
-                "to": props.get("to", ""),
-                "text": "\n".join(text_lines).strip(),
-                "time": time_str,
-                "unread": is_unread,
-                "priority": props.get("priority", "normal"),
-                "source": props.get("source", "local"),
-            }
-        except:
+            st = inbox.stat()
+            state = self._inbox_state.get(inbox)
+            if state and state[:2] == (st.st_mtime_ns, st.st_size):
+                return None
+            with inbox.open("rb") as f:
+                data = None
+                if state and state[2] >= 0 and st.st_size >= state[1]:
+                    offset = state[2]
+                    f.seek(offset)
+                    data = f.read()
+                    if not data.startswith(MESSAGE_MARKER):
+                        data = None  # Rewritten in place, not appended to
+                if data is None:
+                    offset = 0
+                    f.seek(0)
+                    data = f.read()
+        except OSError:
+            self._inbox_state.pop(inbox, None)
             return None
 
-    def _start_watcher(self):
-        """Start timer to watch for new messages."""
-        self.watcher_timer = QTimer(self)
-        self.watcher_timer.timeout.connect(self._check_inbox)
-        self.watcher_timer.start(POLL_INTERVAL)
+        last = data.rfind(MESSAGE_MARKER)
+        self._inbox_state[inbox] = (st.st_mtime_ns, st.st_size, offset + last if last >= 0 else -1)
+        return data
 
     def _check_inbox(self):
         """Check inbox for new messages."""
         try:
-            for inbox in DATACORE_ROOT.glob(f"*/org/inboxes/{self.username}.org"):
-                content = inbox.read_text()
+            for inbox in self._inbox_paths():
+                data = self._read_inbox(inbox)
+                if data is None:
+                    continue
 
-                for block in content.split("\n* MESSAGE ")[1:]:
+                for block in message_blocks(data.decode("utf-8", errors="replace")):
                     msg = self._parse_message_block(block)
 
                     if msg and msg["id"] and msg["id"] not in self.seen_ids:
@@ -642,12 +830,13 @@ class MessageWindow(QMainWindow):
             self.relay_label.setText("(no secret)")
             return
 
-        thread = threading.Thread(target=self._relay_loop, daemon=True)
+        thread = threading.Thread(target=self._relay_thread, daemon=True)
         thread.start()
 
-    def _relay_loop(self):
+    def _relay_thread(self):
         """Run relay client in background."""
         async def run_relay():
+            self.relay_loop = asyncio.get_running_loop()
             self.relay_client = RelayClient(
                 get_relay_url(),
                 get_relay_secret(),
@@ -659,10 +848,13 @@ class MessageWindow(QMainWindow):
             if await self.relay_client.connect():
                 self.relay_connected = True
                 await self.relay_client.listen()
-            else:
-                self.relay_connected = False
 
-        asyncio.run(run_relay())
+        try:
+            asyncio.run(run_relay())
+        finally:
+            # The loop is closed now; later sends go to the inbox only
+            self.relay_connected = False
+            self.relay_loop = None
 
 
 def main():
@@ -685,6 +877,7 @@ def main():
     if is_relay_enabled():
         print(f"Relay: {get_relay_url()}")
 
+    app.aboutToQuit.connect(window._flush_writes)  # Don't lose messages sent just before quitting
     sys.exit(app.exec())
 
 
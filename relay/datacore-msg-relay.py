@@ -20,53 +20,148 @@ Usage:
 import asyncio
 import json
 import os
+import socket
+import sys
 import time
 from dataclasses import dataclass, field
 from typing import Optional
 
 from aiohttp import web, WSMsgType
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import uvloop as fastloop  # libuv-backed event loop
+    HAS_FASTLOOP = True
+except ImportError:
+    try:
+        import winloop as fastloop  # uvloop port for Windows
+        HAS_FASTLOOP = True
+    except ImportError:
+        HAS_FASTLOOP = False
+
 # === CONFIG ===
 
 RELAY_SECRET = os.environ.get("RELAY_SECRET", "")
 PORT = int(os.environ.get("PORT", 8080))
+HEARTBEAT = 60  # s between server pings; a peer silent past it (plus a pong wait) is dropped
+KEEPALIVE = (60, 20, 3)  # TCP keepalive: idle s, probe interval s, probes before drop
+SEND_QUEUE = 256  # frames buffered per user before it is dropped
+SEND_TIMEOUT = 5  # s before a stalled peer is dropped
+PRESENCE_DELAY = 0.05  # s joins/leaves are gathered into one presence broadcast
+CLAUDE_SUFFIX = "-claude"  # "<owner>-claude" is owner's personal Claude agent
+CLAUDE_SUFFIX_LEN = len(CLAUDE_SUFFIX)
+
+# JSON codec for frames: orjson when installed, stdlib otherwise.
+# Frames stay text (str), which is what clients expect.
+if HAS_ORJSON:
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+    json_loads = orjson.loads
+else:
+    def json_dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+    json_loads = json.loads
+
+
+# Pings as clients encode them, matched verbatim so heartbeats skip decoding
+PING_FRAMES = frozenset({'{"type":"ping"}', '{"type": "ping"}'})
+PONG_FRAME = json_dumps({"type": "pong"})
+
+
+def enqueue(user: "User", payload: dict | str) -> bool:
+    """Queue a frame (dict, or JSON already encoded) for user's writer.
+
+    A user whose queue is full has fallen behind and is disconnected.
+    """
+    if user.closer:
+        return False  # Already being dropped; one close is enough
+    try:
+        user.queue.put_nowait(payload if isinstance(payload, str) else json_dumps(payload))
+        return True
+    except asyncio.QueueFull:
+        user.closer = asyncio.create_task(user.ws.close())
+        return False
+
+
+async def write_frames(user: "User"):
+    """Drain a user's send queue; a stalled peer gets disconnected."""
+    queue = user.queue
+    ws = user.ws
+    try:
+        while True:
+            frame = await queue.get()
+            await asyncio.wait_for(ws.send_str(frame), SEND_TIMEOUT)
+    except asyncio.TimeoutError:
+        # Closing ends the peer's handler loop, which runs the cleanup
+        await ws.close()
+    except ConnectionError:
+        pass  # Socket already going away
 
 
 # === DATA STRUCTURES ===
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """Connected user."""
     username: str
     ws: web.WebSocketResponse
     connected_at: float = field(default_factory=time.time)
-    claude_whitelist: list = field(default_factory=list)  # Users allowed to message this user's Claude
+    claude_whitelist: Optional[frozenset] = None  # Users allowed to message this user's Claude; None: anyone
+    # Outgoing frames; drained by `writer`, the only task writing to ws
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(SEND_QUEUE))
+    writer: Optional[asyncio.Task] = None
+    closer: Optional[asyncio.Task] = None  # Set once the user is dropped for falling behind
 
 
 @dataclass
 class RelayServer:
     """Manages WebSocket connections and message routing."""
+    # Copy-on-write: joins and leaves publish a new dict instead of mutating
+    # this one, so a reader holding it across an await sees a stable snapshot
     users: dict[str, User] = field(default_factory=dict)
+    # Usernames of `users`, rebuilt alongside it rather than on every read
+    online: list[str] = field(default_factory=list)
+    # "presence" reply for `online`, encoded on first request after a change
+    presence_frame: Optional[str] = None
+    # Presence changes waiting for the next coalesced broadcast
+    pending_presence: dict[str, str] = field(default_factory=dict)
+    presence_task: Optional[asyncio.Task] = None
 
     def add_user(self, user: User):
         """Add connected user."""
         # Disconnect existing connection if any
-        if user.username in self.users:
-            old = self.users[user.username]
+        old = self.users.get(user.username)
+        if old:
             asyncio.create_task(old.ws.close())
-        self.users[user.username] = user
+        self.users = {**self.users, user.username: user}
+        self.online = list(self.users)
+        self.presence_frame = None
 
     def remove_user(self, username: str):
         """Remove disconnected user."""
-        self.users.pop(username, None)
+        if username in self.users:
+            self.users = {name: user for name, user in self.users.items() if name != username}
+            self.online = list(self.users)
+            self.presence_frame = None
 
     def get_user(self, username: str) -> Optional[User]:
         """Get user by username."""
         return self.users.get(username)
 
     def list_users(self) -> list[str]:
-        """List connected usernames."""
-        return list(self.users.keys())
+        """List connected usernames (shared; don't modify)."""
+        return self.online
+
+    def get_presence_frame(self) -> str:
+        """The "presence" reply, encoded once per change to the online list."""
+        if self.presence_frame is None:
+            self.presence_frame = json_dumps({"type": "presence", "online": self.online})
+        return self.presence_frame
 
     def resolve_claude_target(self, from_user: str, to_user: str) -> tuple:
         """
@@ -79,28 +174,31 @@ class RelayServer:
             return (resolved, True, None)
 
         # Check if messaging someone else's Claude (e.g., @gregor-claude)
-        if to_user.endswith("-claude"):
-            owner = to_user.rsplit("-claude", 1)[0]
+        if to_user.endswith(CLAUDE_SUFFIX):
+            owner = to_user[:-CLAUDE_SUFFIX_LEN]
             owner_user = self.users.get(owner)
 
             # Check if owner has a whitelist configured
-            if owner_user and owner_user.claude_whitelist:
-                if from_user not in owner_user.claude_whitelist:
-                    # Not whitelisted - return auto-reply
-                    return (to_user, False,
-                            f"Auto-reply: @{owner}-claude is not accepting messages from @{from_user}. "
-                            f"Please contact @{owner} directly.")
+            allowed = owner_user.claude_whitelist if owner_user else None
+            if allowed is not None and from_user not in allowed:
+                # Not whitelisted - return auto-reply
+                return (to_user, False,
+                        f"Auto-reply: @{owner}-claude is not accepting messages from @{from_user}. "
+                        f"Please contact @{owner} directly.")
 
         return (to_user, True, None)
 
-    async def route_message(self, from_user: str, to_user: str, message: dict, sender_ws=None):
-        """Route message to recipient if online."""
+    async def route_message(self, from_user: str, to_user: str, message: dict, sender: Optional[User] = None):
+        """Route message to recipient if online.
+
+        `message` becomes the outgoing frame, so pass a dict built for this call.
+        """
         # Resolve @claude and check permissions
         resolved_target, is_allowed, auto_reply = self.resolve_claude_target(from_user, to_user)
 
-        if not is_allowed and auto_reply and sender_ws:
+        if not is_allowed and auto_reply and sender:
             # Send auto-reply back to sender
-            await sender_ws.send_json({
+            enqueue(sender, {
                 "type": "message",
                 "from": resolved_target,
                 "text": auto_reply,
@@ -111,12 +209,9 @@ class RelayServer:
 
         recipient = self.users.get(resolved_target)
         if recipient:
-            await recipient.ws.send_json({
-                "type": "message",
-                "from": from_user,
-                **message
-            })
-            return True
+            message["type"] = "message"
+            message["from"] = from_user
+            return enqueue(recipient, message)
         return False
 
 
@@ -131,167 +226,255 @@ async def handle_status(request: web.Request) -> web.Response:
         "status": "ok",
         "users_online": len(relay.users),
         "users": relay.list_users()
-    })
+    }, dumps=json_dumps)
 
 
 # === WEBSOCKET HANDLER ===
 
+def enable_keepalive(request: web.Request) -> None:
+    """Have the kernel probe the peer's connection, so dead clients drop without heartbeat timers."""
+    sock = request.transport.get_extra_info("socket") if request.transport else None
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):  # Linux; elsewhere the OS defaults apply
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE[0])
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE[1])
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE[2])
+    except OSError:
+        pass
+
+
+@dataclass(slots=True)
+class Connection:
+    """Per-socket state passed to the frame handlers."""
+    ws: web.WebSocketResponse
+    username: Optional[str] = None  # Set once auth succeeds
+    user: Optional[User] = None
+
+    async def reply(self, payload: dict | str):
+        """Answer on this socket, through the user's writer once authenticated."""
+        if self.user:
+            enqueue(self.user, payload)
+        else:
+            await self.ws.send_str(payload if isinstance(payload, str) else json_dumps(payload))
+
+
 async def handle_websocket(request: web.Request) -> web.WebSocketResponse:
     """Handle WebSocket connections."""
-    ws = web.WebSocketResponse(heartbeat=30)
+    # The heartbeat reaps silent peers, including behind fly-proxy where
+    # kernel keepalive only reaches the proxy; keepalive just supplements it
+    ws = web.WebSocketResponse(heartbeat=HEARTBEAT)
     await ws.prepare(request)
+    enable_keepalive(request)
 
-    username = None
+    conn = Connection(ws)
 
     try:
         async for msg in ws:
             if msg.type == WSMsgType.TEXT:
+                if msg.data in PING_FRAMES:
+                    await conn.reply(PONG_FRAME)
+                    continue
                 try:
-                    data = json.loads(msg.data)
-                except json.JSONDecodeError:
-                    await ws.send_json({"type": "error", "message": "Invalid JSON"})
+                    data = json_loads(msg.data)
+                except ValueError:
+                    await conn.reply({"type": "error", "message": "Invalid JSON"})
+                    continue
+                if not isinstance(data, dict):
+                    await conn.reply({"type": "error", "message": "Invalid JSON"})
                     continue
 
-                msg_type = data.get("type")
-
-                # === AUTH ===
-                if msg_type == "auth":
-                    secret = data.get("secret", "")
-                    claimed_username = data.get("username", "")
-
-                    # Verify shared secret
-                    if not RELAY_SECRET:
-                        await ws.send_json({
-                            "type": "auth_error",
-                            "message": "Server not configured (no RELAY_SECRET)"
-                        })
-                        continue
-
-                    if secret != RELAY_SECRET:
-                        await ws.send_json({
-                            "type": "auth_error",
-                            "message": "Invalid secret"
-                        })
-                        continue
-
-                    if not claimed_username:
-                        await ws.send_json({
-                            "type": "auth_error",
-                            "message": "Username required"
-                        })
-                        continue
-
-                    username = claimed_username
-                    claude_whitelist = data.get("claude_whitelist", [])
-
-                    # Add to relay
-                    relay.add_user(User(
-                        username=username,
-                        ws=ws,
-                        claude_whitelist=claude_whitelist
-                    ))
-
-                    await ws.send_json({
-                        "type": "auth_ok",
-                        "username": username,
-                        "online": relay.list_users()
-                    })
-
-                    # Broadcast presence
-                    await broadcast_presence(username, "online")
-
-                # === PRESENCE ===
-                elif msg_type == "presence":
-                    if not username:
-                        await ws.send_json({"type": "error", "message": "Not authenticated"})
-                        continue
-
-                    await ws.send_json({
-                        "type": "presence",
-                        "online": relay.list_users()
-                    })
-
-                # === SEND MESSAGE ===
-                elif msg_type == "send":
-                    if not username:
-                        await ws.send_json({"type": "error", "message": "Not authenticated"})
-                        continue
-
-                    to_user = data.get("to", "").lstrip("@")
-                    text = data.get("text", "")
-                    priority = data.get("priority", "normal")
-                    msg_id = data.get("msg_id", "")
-
-                    if not to_user or not text:
-                        await ws.send_json({
-                            "type": "error",
-                            "message": "Missing 'to' or 'text'"
-                        })
-                        continue
-
-                    # Resolve @claude to sender's personal Claude
-                    resolved_target, _, _ = relay.resolve_claude_target(username, to_user)
-
-                    # Try to deliver
-                    result = await relay.route_message(
-                        from_user=username,
-                        to_user=to_user,
-                        message={
-                            "text": text,
-                            "priority": priority,
-                            "msg_id": msg_id,
-                            "timestamp": time.time()
-                        },
-                        sender_ws=ws
-                    )
-
-                    if result == "auto_replied":
-                        await ws.send_json({
-                            "type": "send_ack",
-                            "to": resolved_target,
-                            "msg_id": msg_id,
-                            "delivered": False,
-                            "auto_replied": True
-                        })
-                    else:
-                        await ws.send_json({
-                            "type": "send_ack",
-                            "to": resolved_target,
-                            "msg_id": msg_id,
-                            "delivered": bool(result),
-                            "queued": not result
-                        })
-
-                # === PING/PONG ===
-                elif msg_type == "ping":
-                    await ws.send_json({"type": "pong"})
+                handler = HANDLERS.get(data.get("type"))
+                if handler:
+                    await handler(conn, data)
 
             elif msg.type == WSMsgType.ERROR:
                 print(f"WebSocket error: {ws.exception()}")
 
     finally:
-        if username:
+        user = conn.user
+        if user and user.writer:
+            user.writer.cancel()
+        # Skip cleanup if a newer connection has taken over this username
+        username = conn.username
+        if username and relay.get_user(username) is user:
             relay.remove_user(username)
-            await broadcast_presence(username, "offline")
+            broadcast_presence(username, "offline")
 
     return ws
 
 
-async def broadcast_presence(username: str, status: str):
-    """Broadcast user presence change to all connected users."""
-    message = {
+async def on_auth(conn: Connection, data: dict):
+    """Verify the shared secret and register the user."""
+    secret = data.get("secret", "")
+    claimed_username = data.get("username", "")
+
+    # Verify shared secret
+    if not RELAY_SECRET:
+        await conn.reply({
+            "type": "auth_error",
+            "message": "Server not configured (no RELAY_SECRET)"
+        })
+        return
+
+    if secret != RELAY_SECRET:
+        await conn.reply({
+            "type": "auth_error",
+            "message": "Invalid secret"
+        })
+        return
+
+    if not claimed_username or not isinstance(claimed_username, str):
+        await conn.reply({
+            "type": "auth_error",
+            "message": "Username required"
+        })
+        return
+
+    # Interned once here; lookups and compares can then hit the identity fast path
+    username = sys.intern(claimed_username)
+    claude_whitelist = frozenset(data.get("claude_whitelist") or ()) or None
+
+    if conn.user and conn.user.writer:
+        conn.user.writer.cancel()  # Re-auth on the same socket
+
+    # Add to relay
+    user = User(
+        username=username,
+        ws=conn.ws,
+        claude_whitelist=claude_whitelist
+    )
+    user.writer = asyncio.create_task(write_frames(user))
+    conn.username, conn.user = username, user
+    relay.add_user(user)
+
+    await conn.reply({
+        "type": "auth_ok",
+        "username": username,
+        "online": relay.list_users()
+    })
+
+    # Broadcast presence
+    broadcast_presence(username, "online")
+
+
+async def on_presence(conn: Connection, data: dict):
+    """Send the online list."""
+    if not conn.username:
+        await conn.reply({"type": "error", "message": "Not authenticated"})
+        return
+
+    await conn.reply(relay.get_presence_frame())
+
+
+async def on_send(conn: Connection, data: dict):
+    """Deliver a message and acknowledge it to the sender."""
+    username = conn.username
+    if not username:
+        await conn.reply({"type": "error", "message": "Not authenticated"})
+        return
+
+    to_user = data.get("to", "")
+    text = data.get("text", "")
+    priority = data.get("priority", "normal")
+    msg_id = data.get("msg_id", "")
+    if isinstance(to_user, str):
+        to_user = to_user.lstrip("@")
+
+    # Frames can carry numbers where strings belong
+    if not (to_user and text and isinstance(to_user, str) and isinstance(text, str)
+            and isinstance(priority, str) and isinstance(msg_id, str)):
+        await conn.reply({
+            "type": "error",
+            "message": "Missing 'to' or 'text'"
+        })
+        return
+
+    # Resolve @claude to sender's personal Claude
+    resolved_target, _, _ = relay.resolve_claude_target(username, to_user)
+
+    # Try to deliver
+    result = await relay.route_message(
+        from_user=username,
+        to_user=to_user,
+        message={
+            "text": text,
+            "priority": priority,
+            "msg_id": msg_id,
+            "timestamp": time.time_ns()
+        },
+        sender=conn.user
+    )
+
+    if result == "auto_replied":
+        await conn.reply({
+            "type": "send_ack",
+            "to": resolved_target,
+            "msg_id": msg_id,
+            "delivered": False,
+            "auto_replied": True
+        })
+    else:
+        await conn.reply({
+            "type": "send_ack",
+            "to": resolved_target,
+            "msg_id": msg_id,
+            "delivered": bool(result),
+            "queued": not result
+        })
+
+
+async def on_ping(conn: Connection, data: dict):
+    """Answer a ping that wasn't one of the verbatim PING_FRAMES."""
+    await conn.reply(PONG_FRAME)
+
+
+# Frame type -> handler; each handler checks its own auth precondition
+HANDLERS = {
+    "auth": on_auth,
+    "presence": on_presence,
+    "send": on_send,
+    "ping": on_ping,
+}
+
+
+def broadcast_presence(username: str, status: str):
+    """Queue a user presence change for the next broadcast to all connected users.
+
+    Changes within PRESENCE_DELAY go out as one frame, so a reconnect
+    storm of K users costs one broadcast rather than K.
+    """
+    relay.pending_presence.pop(username, None)  # Keep changes in arrival order
+    relay.pending_presence[username] = status
+    if relay.presence_task is None:
+        relay.presence_task = asyncio.create_task(flush_presence())
+
+
+async def flush_presence():
+    """Send the pending presence changes, plus the current online list."""
+    await asyncio.sleep(PRESENCE_DELAY)
+    relay.presence_task = None
+    changes, relay.pending_presence = relay.pending_presence, {}
+
+    # "user"/"status" carry the last change for clients that read only those
+    username, status = next(reversed(changes.items()))
+    # Encode once; each peer's writer sends it
+    frame = json_dumps({
         "type": "presence_change",
         "user": username,
         "status": status,
+        "changes": changes,
         "online": relay.list_users()
-    }
+    })
 
-    for user in list(relay.users.values()):
-        if user.username != username:
-            try:
-                await user.ws.send_json(message)
-            except:
-                pass
+    # A lone change isn't echoed to the user who made it. Closed sockets
+    # are skipped; their handlers remove the user
+    skip = username if len(changes) == 1 else None
+    for user in relay.users.values():
+        if user.username != skip and not user.ws.closed:
+            enqueue(user, frame)
 
 
 # === APP ===
@@ -318,7 +501,9 @@ def main():
     app = create_app()
     print(f"Starting relay server on port {PORT}")
     print(f"Secret configured: {'yes' if RELAY_SECRET else 'NO'}")
-    web.run_app(app, port=PORT)
+    print(f"Event loop: {'uvloop' if HAS_FASTLOOP else 'asyncio'}")
+    loop = fastloop.new_event_loop() if HAS_FASTLOOP else None
+    web.run_app(app, port=PORT, loop=loop)
 
 
 if __name__ == "__main__":